@@ -5,4 +5,7 @@ echo "Building the project..."
 python3.9 -m pip install -r requirements.txt
 
 echo "Collecting static files..."
-python3.9 manage.py collectstatic --noinput --clear
\ No newline at end of file
+python3.9 manage.py collectstatic --noinput --clear
+
+echo "Prerendering catalog pages..."
+python3.9 manage.py prerender_catalog || echo "Skipping catalog prerender: no catalog database available."
@@ -2,6 +2,7 @@
 Django settings for clothing_ecommerce project.
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 import os
 
@@ -26,10 +27,12 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'ecommerce_app.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'ecommerce_app.middleware.ProfileMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -76,6 +79,16 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# With the optional argon2-cffi package, new passwords are hashed with a
+# cheaper-per-signup Argon2id; existing PBKDF2 hashes keep working.
+if find_spec('argon2') is not None:
+    PASSWORD_HASHERS = [
+        'ecommerce_app.hashers.TunedArgon2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+    ]
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
@@ -86,12 +99,58 @@ STATICFILES_DIRS = [
     BASE_DIR / "ecommerce_app" / "static",
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles_build' / 'static'
+PRERENDER_ROOT = BASE_DIR / 'staticfiles_build' / 'prerendered'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored under their content hash. MEDIA_STORAGE=s3 keeps them in
+# an S3-compatible bucket instead (needs django-storages and boto3).
+MEDIA_STORAGE = os.environ.get('MEDIA_STORAGE', 'filesystem')
+STORAGES = {
+    'default': {'BACKEND': 'ecommerce_app.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+if MEDIA_STORAGE == 's3':
+    STORAGES['default'] = {
+        'BACKEND': 'ecommerce_app.storage_s3.ContentAddressedS3Storage',
+        'OPTIONS': {
+            'bucket_name': os.environ.get('MEDIA_S3_BUCKET'),
+            'endpoint_url': os.environ.get('MEDIA_S3_ENDPOINT_URL'),
+            'custom_domain': os.environ.get('MEDIA_S3_CUSTOM_DOMAIN'),
+            'querystring_auth': False,
+            'default_acl': None,
+        },
+    }
+# Hand file bodies to nginx, e.g. '/protected-media/' mapped to MEDIA_ROOT
+# with an `internal` location.
+MEDIA_ACCEL_REDIRECT = os.environ.get('MEDIA_ACCEL_REDIRECT')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Where localize_images downloads product photos from; point it at a local
+# HTTP server to run it offline.
+PRODUCT_IMAGE_SOURCE = os.environ.get('PRODUCT_IMAGE_SOURCE', 'https://images.unsplash.com')
+
+# archive_orders moves delivered/cancelled orders and cart items older than
+# these ages out of the live tables.
+ORDER_ARCHIVE_AFTER_DAYS = 365
+CART_ARCHIVE_AFTER_DAYS = 30
+
+# Active products at or below this stock are listed on the admin dashboard
+LOW_STOCK_THRESHOLD = 5
+
+# gzip (or brotli, if installed) responses of at least this many bytes
+COMPRESSION_MIN_SIZE = 1024
+
+# Product and member lists with this many rows are streamed in chunks after
+# the page head has been sent; None renders every page in one piece.
+STREAMING_HTML_MIN_ROWS = 500
+STREAMING_HTML_CHUNK_SIZE = 200
+
+# Serve home, products and product_detail from a per-process in-memory snapshot
+CATALOG_READ_MODEL = os.environ.get('CATALOG_READ_MODEL') == '1'
+
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/login/'
\ No newline at end of file
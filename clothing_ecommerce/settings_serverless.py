@@ -0,0 +1,30 @@
+"""
+Lean settings for the Vercel lambda.
+
+Static files are served by Vercel's static build, so staticfiles and
+WhiteNoise are left out, and the Django admin (which imports every
+admin.py on startup) is only loaded when SERVERLESS_ENABLE_ADMIN=1.
+Pillow is already imported lazily by ImageField, on first upload.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE
+
+SERVERLESS_ENABLE_ADMIN = os.environ.get('SERVERLESS_ENABLE_ADMIN') == '1'
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app != 'django.contrib.staticfiles'
+    and (SERVERLESS_ENABLE_ADMIN or app != 'django.contrib.admin')
+]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware != 'whitenoise.middleware.WhiteNoiseMiddleware'
+]
+
+# Reuse the connection across invocations of a warm lambda.
+DATABASES['default']['CONN_MAX_AGE'] = None  # noqa: F405
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True  # noqa: F405
@@ -1,15 +1,23 @@
 """
 URL configuration for clothing_ecommerce project.
 """
-from django.contrib import admin
-from django.urls import path, include
+import re
+
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from ecommerce_app.media import serve_media
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('', include('ecommerce_app.urls')),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+if 'django.contrib.admin' in settings.INSTALLED_APPS:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
+if settings.MEDIA_STORAGE == 'filesystem':
+    urlpatterns.append(
+        re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media')
+    )
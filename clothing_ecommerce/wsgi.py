@@ -3,9 +3,19 @@ WSGI config for clothing_ecommerce project.
 """
 
 import os
+import time
+
+_started = time.perf_counter()
 
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clothing_ecommerce.settings')
+os.environ.setdefault(
+    'DJANGO_SETTINGS_MODULE',
+    'clothing_ecommerce.settings_serverless' if os.environ.get('VERCEL') else 'clothing_ecommerce.settings'
+)
+
+application = get_wsgi_application()
+
+from ecommerce_app import warmup  # noqa: E402
 
-application = get_wsgi_application()
\ No newline at end of file
+warmup.record_boot(time.perf_counter() - _started)
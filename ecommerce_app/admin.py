@@ -1,39 +1,280 @@
-from django.contrib import admin
-from .models import UserProfile, Category, Product, Order, OrderItem, CartItem
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+from .models import (
+    UserProfile, Category, Product, Order, OrderItem, OrderStatusHistory, CartItem,
+    ArchivedOrder, ArchivedOrderItem, ArchivedCartItem, StockMovement,
+)
+from .bulk import ORDER_TRANSITIONS, set_users_active, transition_orders
+from .inventory import adjust_stock, record_initial_stock
+
+# Below this many rows an exact COUNT(*) is cheap enough to keep.
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def estimate_row_count(model, using='default'):
+    """Planner statistics row count for the model's table, or None if unavailable"""
+    connection = connections[using]
+    table = model._meta.db_table
+    queries = {
+        'postgresql': ('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table]),
+        'mysql': ('SELECT table_rows FROM information_schema.tables '
+                  'WHERE table_schema = DATABASE() AND table_name = %s', [table]),
+        # Populated by ANALYZE; the first number of any index stat is the table row count.
+        'sqlite': ('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table]),
+    }
+    if connection.vendor not in queries:
+        return None
+    sql, params = queries[connection.vendor]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if not row or row[0] is None:
+        return None
+    try:
+        estimate = int(str(row[0]).split()[0])
+    except ValueError:
+        return None
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Uses table statistics instead of COUNT(*) for unfiltered changelists on large tables"""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(LargeTableAdmin):
     list_display = ['full_name', 'user', 'contact_number', 'is_active', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['full_name', 'user__username', 'user__email']
     list_editable = ['is_active']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    actions = ['activate_users', 'deactivate_users']
+
+    @admin.action(description='Activate selected members')
+    def activate_users(self, request, queryset):
+        updated = set_users_active(queryset, True)
+        self.message_user(request, f'{updated} member(s) activated.')
+
+    @admin.action(description='Deactivate selected members')
+    def deactivate_users(self, request, queryset):
+        updated = set_users_active(queryset, False)
+        self.message_user(request, f'{updated} member(s) deactivated.')
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'created_at']
     search_fields = ['name']
 
+class StockLevelFilter(admin.SimpleListFilter):
+    title = 'stock level'
+    parameter_name = 'stock_level'
+
+    def lookups(self, request, model_admin):
+        return [('low', 'Low stock'), ('out', 'Out of stock')]
+
+    def queryset(self, request, queryset):
+        if self.value() == 'low':
+            return queryset.filter(stock__lte=getattr(settings, 'LOW_STOCK_THRESHOLD', 5))
+        if self.value() == 'out':
+            return queryset.filter(stock__lte=0)
+        return queryset
+
+class StockMovementFormSet(forms.BaseInlineFormSet):
+    def clean(self):
+        super().clean()
+        removed = -sum(
+            form.cleaned_data['quantity'] for form in self.forms
+            if form.cleaned_data.get('quantity') and not form.cleaned_data.get('DELETE')
+        )
+        if self.instance.pk and removed > self.instance.stock:
+            raise forms.ValidationError(
+                f'Cannot remove {removed} unit(s); only {self.instance.stock} in stock.'
+            )
+
+class StockMovementInline(admin.TabularInline):
+    """Blank rows for new adjustments; the history is under Stock movements"""
+    model = StockMovement
+    formset = StockMovementFormSet
+    extra = 1
+    can_delete = False
+    fields = ['quantity', 'reason', 'note']
+    verbose_name_plural = 'Adjust stock'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).none()
+
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(LargeTableAdmin):
     list_display = ['name', 'category', 'price', 'stock', 'is_active', 'created_at']
-    list_filter = ['category', 'is_active', 'created_at']
+    list_filter = [StockLevelFilter, 'category', 'is_active', 'created_at']
     search_fields = ['name', 'description']
-    list_editable = ['price', 'stock', 'is_active']
+    # Stock only changes through the ledger, so concurrent edits add up.
+    list_editable = ['price', 'is_active']
+    list_select_related = ['category']
+    autocomplete_fields = ['category']
+    date_hierarchy = 'created_at'
+    inlines = [StockMovementInline]
+
+    def get_readonly_fields(self, request, obj=None):
+        return ['stock'] if obj else []
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            # Never write back the stock read with the form.
+            obj.save(update_fields=[
+                field.name for field in obj._meta.concrete_fields
+                if not field.primary_key and field.name != 'stock'
+            ])
+        else:
+            super().save_model(request, obj, form, change)
+            record_initial_stock([obj], created_by=request.user)
+
+    def save_formset(self, request, form, formset, change):
+        if formset.model is not StockMovement:
+            return super().save_formset(request, form, formset, change)
+        for movement in formset.save(commit=False):
+            try:
+                adjust_stock(form.instance, movement.quantity, movement.reason, movement.note, request.user)
+            except ValidationError as e:
+                # Stock fell between validating the form and saving it.
+                self.message_user(request, ' '.join(e.messages), messages.ERROR)
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
+    autocomplete_fields = ['product']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
+class OrderStatusHistoryInline(admin.TabularInline):
+    model = OrderStatusHistory
+    extra = 0
+    can_delete = False
+    fields = ['from_status', 'to_status', 'changed_by', 'created_at']
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('changed_by')
+
+def order_status_action(status, label):
+    def action(modeladmin, request, queryset):
+        moved = transition_orders(queryset, status, changed_by=request.user)
+        skipped = queryset.count() - moved
+        modeladmin.message_user(request, f'{moved} order(s) marked as {label.lower()}, {skipped} skipped.')
+    action.__name__ = f'mark_{status}'
+    return admin.action(description=f'Mark selected orders as {label.lower()}')(action)
+
+class OrderAdminForm(forms.ModelForm):
+    class Meta:
+        model = Order
+        fields = '__all__'
+
+    def clean_status(self):
+        status = self.cleaned_data['status']
+        current = self.initial.get('status')
+        if self.instance.pk and status != current and status not in ORDER_TRANSITIONS[current]:
+            labels = dict(Order.STATUS_CHOICES)
+            raise forms.ValidationError(
+                f'A {labels[current].lower()} order cannot be marked as {labels[status].lower()}.'
+            )
+        return status
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
+    form = OrderAdminForm
     list_display = ['id', 'user', 'total_amount', 'status', 'created_at']
     list_filter = ['status', 'created_at']
     search_fields = ['user__username', 'user__email']
-    list_editable = ['status']
-    inlines = [OrderItemInline]
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
+    date_hierarchy = 'created_at'
+    inlines = [OrderItemInline, OrderStatusHistoryInline]
+    actions = [
+        order_status_action(status, label)
+        for status, label in Order.STATUS_CHOICES if status != 'pending'
+    ]
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'status' in form.changed_data:
+            OrderStatusHistory.objects.create(
+                order=obj, from_status=form.initial['status'],
+                to_status=obj.status, changed_by=request.user
+            )
 
 @admin.register(CartItem)
-class CartItemAdmin(admin.ModelAdmin):
+class CartItemAdmin(LargeTableAdmin):
     list_display = ['product', 'quantity', 'session_key', 'created_at']
     list_filter = ['created_at']
-    search_fields = ['product__name']
\ No newline at end of file
+    search_fields = ['product__name']
+    list_select_related = ['product']
+    autocomplete_fields = ['product']
+    date_hierarchy = 'created_at'
+
+class ReadOnlyAdminMixin:
+    """Rows written only by code: archive_orders and the stock ledger"""
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+class ArchivedOrderItemInline(ReadOnlyAdminMixin, admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    can_delete = False
+    fields = ['product_name', 'category_name', 'quantity', 'price']
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(ReadOnlyAdminMixin, LargeTableAdmin):
+    list_display = ['id', 'user', 'total_amount', 'status', 'created_at', 'archived_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['user__username', 'user__email']
+    list_select_related = ['user']
+    date_hierarchy = 'created_at'
+    inlines = [ArchivedOrderItemInline]
+
+@admin.register(ArchivedCartItem)
+class ArchivedCartItemAdmin(ReadOnlyAdminMixin, LargeTableAdmin):
+    list_display = ['product', 'quantity', 'session_key', 'created_at', 'archived_at']
+    list_filter = ['created_at']
+    list_select_related = ['product']
+    date_hierarchy = 'created_at'
+
+@admin.register(StockMovement)
+class StockMovementAdmin(ReadOnlyAdminMixin, LargeTableAdmin):
+    list_display = ['product', 'quantity', 'reason', 'note', 'created_by', 'applied', 'created_at']
+    list_filter = ['reason', 'applied', 'created_at']
+    search_fields = ['product__name', 'note']
+    list_select_related = ['product', 'created_by']
+    date_hierarchy = 'created_at'
+
+    def has_delete_permission(self, request, obj=None):
+        return False
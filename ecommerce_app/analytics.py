@@ -0,0 +1,169 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+REPORT_CACHE_TIMEOUT = 300
+TOP_PRODUCTS = 10
+CENT = Decimal('0.01')
+
+line_total = ExpressionWrapper(F('quantity') * F('price'), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def date_range_bounds(start, end):
+    """Aware datetimes covering ``start`` to ``end`` inclusive"""
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, time.min), tz),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    )
+
+
+def money(value):
+    return (value or Decimal('0')).quantize(CENT)
+
+
+def percent_change(current, previous):
+    if not previous:
+        return None
+    return (current - previous) / previous * 100
+
+
+def _sources(since, until):
+    """(orders, items, product name field, category name field) for live and archived orders"""
+    return [
+        (
+            Order.objects.filter(created_at__gte=since, created_at__lt=until).exclude(status='cancelled'),
+            OrderItem.objects.filter(
+                order__created_at__gte=since, order__created_at__lt=until
+            ).exclude(order__status='cancelled'),
+            'product__name', 'product__category__name',
+        ),
+        (
+            ArchivedOrder.objects.filter(created_at__gte=since, created_at__lt=until).exclude(status='cancelled'),
+            ArchivedOrderItem.objects.filter(
+                order__created_at__gte=since, order__created_at__lt=until
+            ).exclude(order__status='cancelled'),
+            'product_name', 'category_name',
+        ),
+    ]
+
+
+def build_sales_report(start, end):
+    """
+    Revenue, order count, average order value, weekly trend, top products and
+    category revenue for non-cancelled orders placed between the two dates,
+    archived orders included.
+
+    Every figure is a GROUP BY in the database, so the work done in Python is
+    proportional to the number of weeks, products and categories reported,
+    not to the number of orders.
+    """
+    since, until = date_range_bounds(start, end)
+    revenue = Decimal('0')
+    order_count = 0
+    weeks = {}
+    products = {}
+    categories = {}
+
+    for orders, items, product_name, category_name in _sources(since, until):
+        summary = orders.aggregate(revenue=Sum('total_amount'), orders=Count('id'))
+        revenue += summary['revenue'] or 0
+        order_count += summary['orders']
+
+        for week, week_revenue, count in (
+            orders.annotate(week=TruncWeek('created_at')).order_by('week')
+            .values('week').annotate(revenue=Sum('total_amount'), orders=Count('id'))
+            .values_list('week', 'revenue', 'orders')
+        ):
+            week = week.date() if isinstance(week, datetime) else week
+            row = weeks.setdefault(week, {'revenue': Decimal('0'), 'orders': 0})
+            row['revenue'] += week_revenue
+            row['orders'] += count
+
+        for product_id, name, units, product_revenue in (
+            items.values('product_id', product_name)
+            .annotate(units=Sum('quantity'), revenue=Sum(line_total))
+            .order_by()
+            .values_list('product_id', product_name, 'units', 'revenue')
+        ):
+            # Renamed products are one row, shown under the live (current) name,
+            # which comes first; deleted products can only be told apart by name.
+            key = product_id if product_id is not None else name
+            row = products.setdefault(key, {'name': name, 'units': 0, 'revenue': Decimal('0')})
+            row['units'] += units
+            row['revenue'] += product_revenue
+
+        for name, units, category_revenue in (
+            items.values(category_name)
+            .annotate(units=Sum('quantity'), revenue=Sum(line_total))
+            .order_by()
+            .values_list(category_name, 'units', 'revenue')
+        ):
+            row = categories.setdefault(name or 'Uncategorized', {'units': 0, 'revenue': Decimal('0')})
+            row['units'] += units
+            row['revenue'] += category_revenue
+
+    # Every calendar week in the range, so weeks without orders show as 0 and
+    # each change is against the week before it.
+    week_rows = []
+    previous = None
+    week = start - timedelta(days=start.weekday())
+    while week <= end:
+        row = weeks.get(week, {'revenue': Decimal('0'), 'orders': 0})
+        week_rows.append({
+            'week': week,
+            'revenue': money(row['revenue']),
+            'orders': row['orders'],
+            'change': percent_change(row['revenue'], previous),
+        })
+        previous = row['revenue']
+        week += timedelta(weeks=1)
+
+    top_products = sorted(
+        (
+            {
+                'id': key if isinstance(key, int) else None, 'name': row['name'],
+                'units': row['units'], 'revenue': money(row['revenue']),
+            }
+            for key, row in products.items()
+        ),
+        key=lambda row: row['revenue'], reverse=True
+    )[:TOP_PRODUCTS]
+
+    category_total = sum((row['revenue'] for row in categories.values()), Decimal('0'))
+    category_rows = sorted(
+        (
+            {
+                'name': name, 'units': row['units'], 'revenue': money(row['revenue']),
+                'share': row['revenue'] / category_total * 100 if category_total else None,
+            }
+            for name, row in categories.items()
+        ),
+        key=lambda row: row['revenue'], reverse=True
+    )
+
+    return {
+        'start': start,
+        'end': end,
+        'revenue': money(revenue),
+        'orders': order_count,
+        'average_order_value': money(revenue / order_count if order_count else None),
+        'weeks': week_rows,
+        'top_products': top_products,
+        'categories': category_rows,
+    }
+
+
+def sales_report(start, end):
+    key = f'sales_report:{start.isoformat()}:{end.isoformat()}'
+    report = cache.get(key)
+    if report is None:
+        report = build_sales_report(start, end)
+        cache.set(key, report, REPORT_CACHE_TIMEOUT)
+    return report
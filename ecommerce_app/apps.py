@@ -3,4 +3,14 @@ from django.apps import AppConfig
 
 class EcommerceAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'ecommerce_app'
\ No newline at end of file
+    name = 'ecommerce_app'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from .models import CatalogVersion, Category, Product
+        from . import tasks  # noqa: F401  registers background tasks
+
+        for model in (Product, Category):
+            uid = f'bump_{model.__name__}'
+            post_save.connect(CatalogVersion.bump, sender=model, dispatch_uid=f'{uid}_save')
+            post_delete.connect(CatalogVersion.bump, sender=model, dispatch_uid=f'{uid}_delete')
@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .bulk import BATCH_SIZE
+from .models import (
+    ArchivedCartItem, ArchivedOrder, ArchivedOrderItem, CartItem, Order, OrderItem, OrderStatusHistory,
+)
+
+# Orders in these states never change again.
+ARCHIVABLE_STATUSES = ['delivered', 'cancelled']
+
+
+def order_cutoff():
+    return timezone.now() - timedelta(days=getattr(settings, 'ORDER_ARCHIVE_AFTER_DAYS', 365))
+
+
+def cart_cutoff():
+    return timezone.now() - timedelta(days=getattr(settings, 'CART_ARCHIVE_AFTER_DAYS', 30))
+
+
+def archive_order_batch(cutoff, batch_size=BATCH_SIZE):
+    """
+    Move one batch of finished orders placed before ``cutoff``, with their
+    items and status history, into the archive tables. Returns the number
+    of orders moved.
+    """
+    with transaction.atomic():
+        orders = list(
+            Order.objects.select_for_update()
+            .filter(status__in=ARCHIVABLE_STATUSES, created_at__lt=cutoff)
+            .order_by('created_at', 'id')[:batch_size]
+        )
+        if not orders:
+            return 0
+        ids = [order.id for order in orders]
+
+        history = {}
+        for order_id, from_status, to_status, changed_by_id, created_at in (
+            OrderStatusHistory.objects.filter(order_id__in=ids).order_by('created_at')
+            .values_list('order_id', 'from_status', 'to_status', 'changed_by_id', 'created_at')
+        ):
+            history.setdefault(order_id, []).append({
+                'from_status': from_status, 'to_status': to_status,
+                'changed_by': changed_by_id, 'created_at': created_at.isoformat(),
+            })
+
+        now = timezone.now()
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(
+                id=order.id, user_id=order.user_id, total_amount=order.total_amount, status=order.status,
+                created_at=order.created_at, updated_at=order.updated_at,
+                status_history=history.get(order.id, []), archived_at=now
+            )
+            for order in orders
+        ])
+        ArchivedOrderItem.objects.bulk_create([
+            ArchivedOrderItem(
+                order_id=order_id, product_id=product_id, product_name=product_name,
+                category_name=category_name or '', quantity=quantity, price=price
+            )
+            for order_id, product_id, product_name, category_name, quantity, price in (
+                OrderItem.objects.filter(order_id__in=ids).order_by('id')
+                .values_list('order_id', 'product_id', 'product__name', 'product__category__name', 'quantity', 'price')
+            )
+        ])
+        # Items and status history go with their orders (on_delete=CASCADE).
+        Order.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def archive_cart_batch(cutoff, batch_size=BATCH_SIZE):
+    """
+    Move up to ``batch_size`` whole carts whose newest item was added before
+    ``cutoff``, so a cart still in use is never split. Returns the number of
+    items moved.
+    """
+    with transaction.atomic():
+        sessions = list(
+            CartItem.objects.values('session_key')
+            .annotate(last_added=Max('created_at'))
+            .filter(last_added__lt=cutoff)
+            .order_by('last_added', 'session_key')
+            .values_list('session_key', flat=True)[:batch_size]
+        )
+        if not sessions:
+            return 0
+        items = list(
+            CartItem.objects.select_for_update()
+            .filter(session_key__in=sessions)
+            .exclude(session_key__in=CartItem.objects.filter(created_at__gte=cutoff).values('session_key'))
+            .order_by('id')
+        )
+        now = timezone.now()
+        ArchivedCartItem.objects.bulk_create([
+            ArchivedCartItem(
+                session_key=item.session_key, product_id=item.product_id, quantity=item.quantity,
+                created_at=item.created_at, archived_at=now
+            )
+            for item in items
+        ])
+        CartItem.objects.filter(id__in=[item.id for item in items]).delete()
+    return len(items)
+
+
+def archive(batch, cutoff, batch_size=BATCH_SIZE, max_batches=None):
+    """Run ``batch`` until nothing is left (or ``max_batches``); each batch is its own transaction"""
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = batch(cutoff, batch_size)
+        if not count:
+            break
+        moved += count
+        batches += 1
+    return moved
+
+
+def archive_orders(cutoff=None, batch_size=BATCH_SIZE, max_batches=None):
+    return archive(archive_order_batch, cutoff or order_cutoff(), batch_size, max_batches)
+
+
+def archive_carts(cutoff=None, batch_size=BATCH_SIZE, max_batches=None):
+    return archive(archive_cart_batch, cutoff or cart_cutoff(), batch_size, max_batches)
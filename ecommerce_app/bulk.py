@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Order, OrderStatusHistory, UserProfile
+
+# Allowed status moves; anything else is skipped by transition_orders.
+ORDER_TRANSITIONS = {
+    'pending': ['confirmed', 'cancelled'],
+    'confirmed': ['shipped', 'cancelled'],
+    'shipped': ['delivered'],
+    'delivered': [],
+    'cancelled': [],
+}
+
+# Moves that may be applied to every eligible order at once; anything else,
+# cancelling in particular, needs explicitly selected orders.
+FORWARD_STATUSES = ['shipped', 'delivered']
+
+# Stays under SQLite's bound-parameter limit for IN (...) lookups.
+BATCH_SIZE = 500
+
+
+def source_statuses(to_status):
+    return [status for status, targets in ORDER_TRANSITIONS.items() if to_status in targets]
+
+
+def transition_orders(orders, to_status, changed_by=None):
+    """
+    Move every order in ``orders`` that may go to ``to_status``.
+
+    Orders are locked and moved BATCH_SIZE at a time, each batch in its own
+    transaction: one filtered UPDATE plus one bulk INSERT into the status
+    history. Returns the number of orders moved; orders whose current status
+    does not allow the move are left untouched.
+    """
+    sources = source_statuses(to_status)
+    if not sources:
+        return 0
+
+    moved = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                orders.select_for_update()
+                .filter(status__in=sources, id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'status')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            now = timezone.now()
+            Order.objects.filter(
+                id__in=[order_id for order_id, _ in batch], status__in=sources
+            ).update(status=to_status, updated_at=now)
+            OrderStatusHistory.objects.bulk_create([
+                OrderStatusHistory(
+                    order_id=order_id, from_status=status, to_status=to_status,
+                    changed_by=changed_by, created_at=now
+                )
+                for order_id, status in batch
+            ])
+        moved += len(batch)
+        last_id = batch[-1][0]
+    return moved
+
+
+def set_users_active(profiles, is_active):
+    """Activate or deactivate every profile in ``profiles`` with one UPDATE"""
+    return profiles.exclude(is_active=is_active).update(is_active=is_active)
@@ -0,0 +1,132 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import CatalogVersion, Product
+
+PRICE_BUCKETS = [
+    ('under-50', 'Under $50', None, Decimal('50')),
+    ('50-100', '$50 - $100', Decimal('50'), Decimal('100')),
+    ('100-200', '$100 - $200', Decimal('100'), Decimal('200')),
+    ('200-plus', '$200 & Above', Decimal('200'), None),
+]
+
+FACET_CACHE_TIMEOUT = 300
+
+
+def parse_price(value):
+    if not value:
+        return None
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        return None
+    if not price.is_finite() or price < 0:
+        return None
+    return price
+
+
+def parse_filters(params):
+    """Read category, price range and in-stock filters from a QueryDict"""
+    category_id = params.get('category')
+    if not (category_id and category_id.isdigit()):
+        category_id = None
+
+    min_price = parse_price(params.get('min_price'))
+    max_price = parse_price(params.get('max_price'))
+    bucket = params.get('price')
+    for key, label, low, high in PRICE_BUCKETS:
+        if key == bucket:
+            min_price, max_price = low, high
+            break
+    else:
+        bucket = None
+
+    return {
+        'category': int(category_id) if category_id else None,
+        'min_price': min_price,
+        'max_price': max_price,
+        'price': bucket,
+        'in_stock': params.get('in_stock') == '1',
+    }
+
+
+def price_q(min_price, max_price, include_max=False):
+    q = Q()
+    if min_price is not None:
+        q &= Q(price__gte=min_price)
+    if max_price is not None:
+        q &= Q(price__lte=max_price) if include_max else Q(price__lt=max_price)
+    return q
+
+
+def filters_price_q(filters):
+    # PRICE_BUCKETS are half-open so they do not overlap; a maximum the
+    # visitor typed in includes that price.
+    return price_q(filters['min_price'], filters['max_price'], include_max=not filters['price'])
+
+
+def filter_products(queryset, filters):
+    if filters['category']:
+        queryset = queryset.filter(category_id=filters['category'])
+    if filters['in_stock']:
+        queryset = queryset.filter(stock__gt=0)
+    return queryset.filter(filters_price_q(filters))
+
+
+def _facet_cache_key(filters):
+    # The version lives in the database, not the cache, so every process sees
+    # the same one even with a per-process cache such as LocMemCache.
+    version = CatalogVersion.current()
+    parts = [
+        filters['min_price'], filters['max_price'], filters['price'] or '',
+        int(filters['in_stock']), filters['category'] or '',
+    ]
+    return 'catalog_facets:%s:%s' % (version, ':'.join(str(p) for p in parts))
+
+
+def compute_facets(filters):
+    """
+    Category and price bucket counts for the current filters.
+
+    One grouped query returns, per category, the count inside the selected
+    price range and the count inside every price bucket. Category counts
+    honour the price filter and bucket counts honour the category filter,
+    so each facet shows what selecting it would return.
+    """
+    queryset = Product.objects.filter(is_active=True)
+    if filters['in_stock']:
+        queryset = queryset.filter(stock__gt=0)
+
+    aggregates = {
+        'in_range': Count('id', filter=filters_price_q(filters)),
+    }
+    for key, label, low, high in PRICE_BUCKETS:
+        aggregates[key] = Count('id', filter=price_q(low, high))
+
+    rows = queryset.order_by().values('category_id').annotate(**aggregates)
+
+    category_counts = {}
+    bucket_counts = dict.fromkeys([bucket[0] for bucket in PRICE_BUCKETS], 0)
+    for row in rows:
+        category_counts[row['category_id']] = row['in_range']
+        if filters['category'] and row['category_id'] != filters['category']:
+            continue
+        for key in bucket_counts:
+            bucket_counts[key] += row[key]
+
+    return {
+        'categories': category_counts,
+        'all_categories': sum(category_counts.values()),
+        'price_buckets': bucket_counts,
+    }
+
+
+def get_facets(filters):
+    key = _facet_cache_key(filters)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(filters)
+        cache.set(key, facets, FACET_CACHE_TIMEOUT)
+    return facets
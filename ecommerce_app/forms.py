@@ -1,5 +1,4 @@
 from django import forms
-from django.contrib.auth.models import User
 from .models import UserProfile
 
 class UserRegistrationForm(forms.Form):
@@ -13,10 +12,9 @@ class UserRegistrationForm(forms.Form):
     confirm_password = forms.CharField(widget=forms.PasswordInput(attrs={'class': 'form-control'}))
 
     def clean_email(self):
-        email = self.cleaned_data['email']
-        if User.objects.filter(email=email).exists():
-            raise forms.ValidationError("Email already exists.")
-        return email
+        # The email becomes the username, so A@Example.com and a@example.com
+        # must be the same account.
+        return self.cleaned_data['email'].lower()
 
     def clean(self):
         cleaned_data = super().clean()
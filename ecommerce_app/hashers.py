@@ -0,0 +1,15 @@
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id at the OWASP minimum (19 MiB, 2 passes, 1 lane).
+
+    Django's defaults use 100 MiB and 8 lanes, which only pays off with 8
+    cores; on a single-core worker this costs ~30 ms per signup or login
+    instead of ~260 ms. Hashes made with other parameters are rehashed on
+    the next login.
+    """
+    time_cost = 2
+    memory_cost = 19456
+    parallelism = 1
@@ -0,0 +1,129 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .models import CatalogVersion, Product
+
+logger = logging.getLogger(__name__)
+
+# First keyword found in the product name picks the photo.
+PRODUCT_PHOTOS = [
+    ('Polo', 'photo-1586790170083-2f9ceadc732d'),
+    ('Blazer', 'photo-1507003211169-0a1dd7228f2d'),
+    ('Chinos', 'photo-1473966968600-fa801b869a1a'),
+    ('Jeans', 'photo-1542272604-787c3835535d'),
+    ('Dress', 'photo-1515372039744-b8f02a3ae446'),
+    ('Jacket', 'photo-1594633312681-425c7b97ccd1'),
+    ('Scarf', 'photo-1601924994987-69e26d50dc26'),
+    ('Blouse', 'photo-1551698618-1dfe5d97d256'),
+    ('Watch', 'photo-1523275335684-37898b6baf30'),
+    ('Handbag', 'photo-1553062407-98eeb64c6a62'),
+    ('Wallet', 'photo-1627123424574-724758594e93'),
+    ('Sunglasses', 'photo-1572635196237-14b3f281503f'),
+    ('Sneakers', 'photo-1549298916-b41d501d3772'),
+    ('Oxford', 'photo-1614252235316-8c857d38b5f4'),
+    ('Loafers', 'photo-1582897085656-c636d006a246'),
+    ('Running', 'photo-1542291026-7eec264c27ff'),
+]
+DEFAULT_PHOTO = 'photo-1523381210434-271e8be1f52b'
+
+# Largest size any page shows (product detail, 2x for the 250px cards).
+IMAGE_SIZE = (600, 720)
+JPEG_QUALITY = 82
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def photo_for(name):
+    for keyword, photo in PRODUCT_PHOTOS:
+        if keyword in name:
+            return photo
+    return DEFAULT_PHOTO
+
+
+def source_url(photo, source=None):
+    source = source or getattr(settings, 'PRODUCT_IMAGE_SOURCE', 'https://images.unsplash.com')
+    width, height = IMAGE_SIZE
+    return f"{source.rstrip('/')}/{photo}?w={width}&h={height}&fit=crop"
+
+
+def fetch(url, retries=3, timeout=10, backoff=0.5):
+    """GET ``url``, retrying connection errors and 429/5xx with exponential backoff"""
+    attempt = 0
+    while True:
+        try:
+            with urlopen(Request(url, headers={'User-Agent': 'RiseArc image localizer'}), timeout=timeout) as response:
+                return response.read()
+        except HTTPError as e:
+            if e.code not in RETRY_STATUSES or attempt >= retries:
+                raise
+        except (URLError, TimeoutError):
+            if attempt >= retries:
+                raise
+        time.sleep(backoff * 2 ** attempt)
+        attempt += 1
+
+
+def optimize(data):
+    """Crop and downscale to IMAGE_SIZE and re-encode as progressive JPEG"""
+    from PIL import Image, ImageOps
+
+    image = Image.open(BytesIO(data))
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    if image.width >= IMAGE_SIZE[0] and image.height >= IMAGE_SIZE[1]:
+        image = ImageOps.fit(image, IMAGE_SIZE, Image.LANCZOS)
+    else:
+        image.thumbnail(IMAGE_SIZE, Image.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def fetch_and_optimize(url, retries, timeout):
+    return optimize(fetch(url, retries=retries, timeout=timeout))
+
+
+def localize_product_images(products, source=None, workers=8, retries=3, timeout=10):
+    """
+    Download the photo for each product concurrently, store it through the
+    content-addressed default storage and point ``Product.image`` at it.
+
+    Products sharing a photo share one download and one file. Returns
+    (updated, unchanged, failed) counts.
+    """
+    by_photo = {}
+    for product in products:
+        by_photo.setdefault(photo_for(product.name), []).append(product)
+
+    updated = unchanged = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(fetch_and_optimize, source_url(photo, source), retries, timeout): photo
+            for photo in by_photo
+        }
+        # Storage and database writes stay on this thread.
+        for future in as_completed(futures):
+            photo = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                logger.warning('Could not localize %s: %s', photo, e)
+                failed += len(by_photo[photo])
+                continue
+            name = default_storage.save(f'products/{photo}.jpg', ContentFile(data))
+            stale = [product.id for product in by_photo[photo] if product.image.name != name]
+            if stale:
+                Product.objects.filter(id__in=stale).update(image=name, updated_at=timezone.now())
+            updated += len(stale)
+            unchanged += len(by_photo[photo]) - len(stale)
+
+    if updated:
+        CatalogVersion.bump()
+    return updated, unchanged, failed
@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .bulk import BATCH_SIZE
+from .models import CatalogVersion, Product, StockMovement
+
+
+def catalog_changed():
+    # QuerySet.update() sends no post_save, so move the catalog version directly.
+    CatalogVersion.bump()
+
+
+def crossed_zero(stock, added):
+    """Whether adding ``added`` took ``stock`` in or out of stock"""
+    return (stock > 0) != (stock - added > 0)
+
+
+def add_stock(totals, now):
+    """
+    Apply {product_id: quantity} with one F() UPDATE per product. Returns
+    whether any product went in or out of stock, the only stock change the
+    catalog snapshot and facet counts depend on.
+    """
+    totals = {product_id: quantity for product_id, quantity in totals.items() if quantity}
+    for product_id, quantity in sorted(totals.items()):
+        Product.objects.filter(id=product_id).update(stock=F('stock') + quantity, updated_at=now)
+    return any(
+        crossed_zero(stock, totals[product_id])
+        for product_id, stock in Product.objects.filter(id__in=list(totals)).values_list('id', 'stock')
+    )
+
+
+def adjust_stock(product, quantity, reason='adjustment', note='', created_by=None):
+    """
+    Add ``quantity`` (negative to remove) to the product's stock right away.
+
+    The change is one ``stock = stock + quantity`` UPDATE plus its ledger
+    row, so concurrent adjustments add up instead of overwriting each other.
+    Removing more than is in stock raises ValidationError and records nothing.
+    """
+    product_id = getattr(product, 'pk', product)
+    products = Product.objects.filter(id=product_id)
+    with transaction.atomic():
+        # The bound is part of the UPDATE, so two removals cannot both pass it.
+        bounded = products.filter(stock__gte=-quantity) if quantity < 0 else products
+        if not bounded.update(stock=F('stock') + quantity, updated_at=timezone.now()):
+            stock = products.values_list('stock', flat=True).first()
+            raise ValidationError(f'Cannot remove {-quantity} unit(s); only {stock or 0} in stock.')
+        movement = StockMovement.objects.create(
+            product_id=product_id, quantity=quantity, reason=reason, note=note,
+            created_by=created_by, applied=True
+        )
+        stock = products.values_list('stock', flat=True).get()
+    if crossed_zero(stock, quantity):
+        catalog_changed()
+    return movement
+
+
+def record_initial_stock(products, created_by=None):
+    """Ledger rows for stock that products were created with"""
+    return StockMovement.objects.bulk_create([
+        StockMovement(
+            product_id=product.pk, quantity=product.stock, reason='initial',
+            created_by=created_by, applied=True
+        )
+        for product in products if product.stock
+    ], batch_size=BATCH_SIZE)
+
+
+def compact_stock_batch(batch_size=BATCH_SIZE):
+    """
+    Add one batch of pending movements to ``Product.stock``, one UPDATE per
+    product, and mark them applied. Returns the number of movements applied
+    and whether a product went in or out of stock.
+    """
+    with transaction.atomic():
+        rows = list(
+            StockMovement.objects.select_for_update()
+            .filter(applied=False)
+            .order_by('id')
+            .values_list('id', 'product_id', 'quantity')[:batch_size]
+        )
+        if not rows:
+            return 0, False
+        totals = {}
+        for _, product_id, quantity in rows:
+            totals[product_id] = totals.get(product_id, 0) + quantity
+        crossed = add_stock(totals, timezone.now())
+        StockMovement.objects.filter(id__in=[movement_id for movement_id, _, _ in rows]).update(applied=True)
+    return len(rows), crossed
+
+
+def compact_stock(batch_size=BATCH_SIZE, max_batches=None):
+    """Apply pending movements until none are left (or ``max_batches``); each batch is its own transaction"""
+    applied = batches = 0
+    changed = False
+    while max_batches is None or batches < max_batches:
+        count, crossed = compact_stock_batch(batch_size)
+        if not count:
+            break
+        applied += count
+        batches += 1
+        changed = changed or crossed
+    if changed:
+        catalog_changed()
+    return applied
+
+
+def low_stock(threshold=None):
+    """Active products at or below ``threshold`` units, lowest first (uses product_stock_idx)"""
+    if threshold is None:
+        threshold = getattr(settings, 'LOW_STOCK_THRESHOLD', 5)
+    return Product.objects.filter(is_active=True, stock__lte=threshold).order_by('stock', 'id')
@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ecommerce_app.archive import archive_carts, archive_orders, cart_cutoff, order_cutoff
+from ecommerce_app.bulk import BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Move old delivered/cancelled orders and stale cart items into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--order-days', type=int,
+                            help='Archive finished orders placed more than this many days ago '
+                                 '(default: ORDER_ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--cart-days', type=int,
+                            help='Archive carts whose last item was added more than this many days ago '
+                                 '(default: CART_ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Orders or carts moved per transaction')
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches of each kind')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        orders_before = now - timedelta(days=options['order_days']) if options['order_days'] is not None else order_cutoff()
+        carts_before = now - timedelta(days=options['cart_days']) if options['cart_days'] is not None else cart_cutoff()
+
+        orders = archive_orders(orders_before, options['batch_size'], options['max_batches'])
+        carts = archive_carts(carts_before, options['batch_size'], options['max_batches'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {orders} order(s) placed before {orders_before:%Y-%m-%d} '
+            f'and {carts} item(s) of carts last added to before {carts_before:%Y-%m-%d}.'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ecommerce_app.recommendations import TOP_K, build_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Update "frequently bought together" recommendations from new orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild from every order instead of only new ones')
+        parser.add_argument('--top', type=int, default=TOP_K, help='Related products stored per product')
+
+    def handle(self, *args, **options):
+        run = build_recommendations(full=options['full'], k=options['top'])
+        if run is None:
+            self.stdout.write('No new orders since the last run.')
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {run.pairs_updated} related products up to order #{run.last_order_id}.'
+        ))
@@ -0,0 +1,90 @@
+import gc
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ecommerce_app.models import Category, Product
+from ecommerce_app.read_model import CatalogSnapshot, CategoryRecord, ImageRef, ProductRecord
+
+
+def measure(build):
+    """Return (result, bytes still allocated by build())"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def synthetic_snapshot(count, description_words):
+    categories = [CategoryRecord(i, f'Category {i}', '') for i in range(1, 5)]
+    now = timezone.now()
+    description = ' '.join(['premium'] * description_words)
+    products = [
+        ProductRecord(
+            i, f'Product {i}', f'{description} {i}', categories[i % len(categories)],
+            Decimal(i % 500) + Decimal('0.99'), i % 50, ImageRef(f'products/{i}.jpg'), True, now
+        )
+        for i in range(1, count + 1)
+    ]
+    return CatalogSnapshot(0, categories, products)
+
+
+def synthetic_models(count, description_words):
+    category = Category(id=1, name='Category 1')
+    now = timezone.now()
+    description = ' '.join(['premium'] * description_words)
+    return [
+        Product(
+            id=i, name=f'Product {i}', description=f'{description} {i}', category=category,
+            price=Decimal(i % 500) + Decimal('0.99'), stock=i % 50, image=f'products/{i}.jpg',
+            is_active=True, created_at=now, updated_at=now
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Report the memory footprint of the in-memory catalog snapshot per 10k products'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--synthetic', type=int, default=0,
+                            help='Measure this many generated products instead of the database catalog')
+        parser.add_argument('--description-words', type=int, default=20,
+                            help='Description length of generated products')
+
+    def handle(self, *args, **options):
+        count = options['synthetic']
+        if count:
+            snapshot, snapshot_bytes = measure(lambda: synthetic_snapshot(count, options['description_words']))
+            _, model_bytes = measure(lambda: synthetic_models(count, options['description_words']))
+        else:
+            def load_models():
+                return list(Product.objects.filter(is_active=True).select_related('category'))
+
+            # Warm up once so one-off allocations (query compilation, storage setup) are not counted.
+            CatalogSnapshot.load(0)
+            load_models()
+            snapshot, snapshot_bytes = measure(lambda: CatalogSnapshot.load(0))
+            count = len(snapshot.products)
+            _, model_bytes = measure(load_models)
+
+        if not count:
+            self.stdout.write('No products to measure.')
+            return
+
+        per_10k = 10000 / count
+        self.stdout.write(f'Products measured: {count}')
+        self.stdout.write(
+            f'Snapshot:        {snapshot_bytes / 1024 / 1024:8.2f} MiB total, '
+            f'{snapshot_bytes / count:8.0f} B/product, {snapshot_bytes * per_10k / 1024 / 1024:6.2f} MiB per 10k'
+        )
+        self.stdout.write(
+            f'Model instances: {model_bytes / 1024 / 1024:8.2f} MiB total, '
+            f'{model_bytes / count:8.0f} B/product, {model_bytes * per_10k / 1024 / 1024:6.2f} MiB per 10k'
+        )
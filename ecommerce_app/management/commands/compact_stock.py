@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from ecommerce_app.bulk import BATCH_SIZE
+from ecommerce_app.inventory import compact_stock
+
+
+class Command(BaseCommand):
+    help = 'Add pending stock movements to Product.stock'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Movements applied per transaction')
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+
+    def handle(self, *args, **options):
+        applied = compact_stock(options['batch_size'], options['max_batches'])
+        self.stdout.write(self.style.SUCCESS(f'Applied {applied} stock movement(s).'))
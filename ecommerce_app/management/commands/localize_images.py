@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from ecommerce_app.images import localize_product_images
+from ecommerce_app.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Download product photos, optimize them and store them as local product images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source',
+                            help='Base URL photos are fetched from (default: PRODUCT_IMAGE_SOURCE)')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent downloads')
+        parser.add_argument('--retries', type=int, default=3, help='Retries per photo on network errors and 429/5xx')
+        parser.add_argument('--timeout', type=float, default=10, help='Seconds per request')
+        parser.add_argument('--force', action='store_true',
+                            help='Also re-fetch products that already have an image (replaces it)')
+
+    def handle(self, *args, **options):
+        products = Product.objects.only('id', 'name', 'image')
+        if not options['force']:
+            products = products.filter(Q(image='') | Q(image__isnull=True))
+        products = list(products)
+        if not products:
+            self.stdout.write('Every product already has a local image.')
+            return
+
+        updated, unchanged, failed = localize_product_images(
+            products, source=options['source'], workers=options['workers'],
+            retries=options['retries'], timeout=options['timeout']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Localized {updated} product image(s), {unchanged} already up to date, {failed} failed.'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from ecommerce_app.prerender import output_root, prerender_catalog
+
+
+class Command(BaseCommand):
+    help = 'Render home, product listings and product pages to static HTML'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Re-render every product instead of only those changed since the last build')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Render processes (defaults to the CPU count)')
+        parser.add_argument('--output', default=None, help=f'Output directory (defaults to {output_root()})')
+
+    def handle(self, *args, **options):
+        stats = prerender_catalog(root=options['output'], full=options['full'], workers=options['workers'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {stats['listings']} listing page(s) and {stats['products']} product page(s), "
+            f"removed {stats['removed']}."
+        ))
@@ -0,0 +1,114 @@
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from ecommerce_app.models import Category, Product, UserProfile
+
+PAGES = {
+    'products': '/products/',
+    'members': '/admin-dashboard/',
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+def seed(page, rows):
+    if page == 'products':
+        category = Category.objects.create(name='Profile pages')
+        Product.objects.bulk_create([
+            Product(
+                name=f'Profiled product {i}', description='Premium profiled product ' * 4,
+                category=category, price=Decimal(i % 500) + Decimal('0.99'), stock=i % 50
+            )
+            for i in range(rows)
+        ], batch_size=500)
+    else:
+        users = User.objects.bulk_create([
+            User(username=f'profiled-{i}@example.com', email=f'profiled-{i}@example.com', password='!')
+            for i in range(rows)
+        ], batch_size=500)
+        UserProfile.objects.bulk_create([
+            UserProfile(
+                user=user, full_name=f'Profiled Member {i}', address='1 Test Street',
+                contact_number='0000000000', date_of_birth='1990-01-01'
+            )
+            for i, user in enumerate(users)
+        ], batch_size=500)
+
+
+def fetch(client, url, encoding):
+    """Return (seconds to first byte, seconds to last byte, bytes sent)"""
+    start = time.perf_counter()
+    response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+    if response.streaming:
+        chunks = iter(response.streaming_content)
+        first = next(chunks, b'')
+        ttfb = time.perf_counter() - start
+        size = len(first) + sum(len(chunk) for chunk in chunks)
+    else:
+        ttfb = time.perf_counter() - start
+        size = len(response.content)
+    return ttfb, time.perf_counter() - start, size
+
+
+class Command(BaseCommand):
+    help = 'Measure time to first byte and peak memory of a large page, buffered vs streamed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page', choices=sorted(PAGES), default='products')
+        parser.add_argument('--rows', type=int, default=10000,
+                            help='Rows added (and rolled back afterwards) before measuring')
+        parser.add_argument('--runs', type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                seed(options['page'], options['rows'])
+                self.measure(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def measure(self, options):
+        url = PAGES[options['page']]
+        host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        client = Client(SERVER_NAME=host)
+        if options['page'] == 'members':
+            client.force_login(User.objects.create_superuser('profile-pages-admin', 'p@example.com', None))
+
+        encodings = ['identity', 'gzip']
+        try:
+            import brotli  # noqa: F401
+            encodings.append('br')
+        except ImportError:
+            pass
+
+        self.stdout.write(f"{url} with {options['rows']} extra rows, best of {options['runs']}")
+        self.stdout.write(f"{'mode':10} {'encoding':9} {'ttfb ms':>9} {'total ms':>9} {'peak MiB':>9} {'bytes':>11}")
+        for mode, min_rows in (('buffered', None), ('streamed', 1)):
+            with override_settings(STREAMING_HTML_MIN_ROWS=min_rows):
+                fetch(client, url, 'identity')  # warm template and query caches
+                for encoding in encodings:
+                    timings = [fetch(client, url, encoding) for _ in range(options['runs'])]
+                    ttfb = min(t[0] for t in timings)
+                    total = min(t[1] for t in timings)
+                    size = timings[0][2]
+
+                    tracemalloc.start()
+                    fetch(client, url, encoding)
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+
+                    self.stdout.write(
+                        f'{mode:10} {encoding:9} {ttfb * 1000:9.1f} {total * 1000:9.1f} '
+                        f'{peak / 2 ** 20:9.1f} {size:11}'
+                    )
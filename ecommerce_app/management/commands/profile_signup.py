@@ -0,0 +1,96 @@
+import statistics
+import time
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+PASSWORD = 'Signup-benchmark-9'
+# Not counted as queries
+TRANSACTION_SQL = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+HASHERS = {
+    'configured': None,
+    'pbkdf2': ['django.contrib.auth.hashers.PBKDF2PasswordHasher'],
+    'scrypt': ['django.contrib.auth.hashers.ScryptPasswordHasher'],
+    'argon2': ['django.contrib.auth.hashers.Argon2PasswordHasher'],
+    'argon2-tuned': ['ecommerce_app.hashers.TunedArgon2PasswordHasher'],
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+def signup_data(email):
+    return {
+        'full_name': 'Signup Benchmark', 'email': email, 'address': '1 Test Street',
+        'contact_number': '0000000000', 'date_of_birth': '1990-01-01',
+        'password': PASSWORD, 'confirm_password': PASSWORD,
+    }
+
+
+def register(client, email):
+    """Return (seconds, queries) for one POST to the registration view"""
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = client.post('/register/', signup_data(email))
+        elapsed = time.perf_counter() - start
+    if response.status_code != 302 and 'already exists' not in response.content.decode():
+        raise RuntimeError(f'Registration of {email} failed with status {response.status_code}')
+    return elapsed, sum(not query['sql'].startswith(TRANSACTION_SQL) for query in queries)
+
+
+class Command(BaseCommand):
+    help = 'Measure queries, latency and password hashing cost per registration'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--signups', type=int, default=20,
+                            help='Registrations per hasher (rolled back afterwards)')
+        parser.add_argument('--hasher', choices=sorted(HASHERS), action='append',
+                            help='Hasher to measure; repeat for several (default: all available)')
+
+    def handle(self, *args, **options):
+        names = options['hasher'] or list(HASHERS)
+        if find_spec('argon2') is None:
+            names = [name for name in names if not name.startswith('argon2')]
+
+        host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        client = Client(SERVER_NAME=host)
+        signups = options['signups']
+
+        self.stdout.write(f'{signups} registrations per hasher, plus one duplicate email')
+        self.stdout.write(
+            f"{'hasher':14} {'algorithm':14} {'hash ms':>8} {'signup ms':>10} "
+            f"{'queries':>8} {'duplicate queries':>18}"
+        )
+        for name in names:
+            overrides = {'PASSWORD_HASHERS': HASHERS[name]} if HASHERS[name] else {}
+            with override_settings(**overrides):
+                try:
+                    with transaction.atomic():
+                        self.measure(client, name, signups)
+                        raise Rollback
+                except Rollback:
+                    pass
+
+    def measure(self, client, name, signups):
+        hasher = get_hasher()
+        hasher.encode(PASSWORD, hasher.salt())  # load the hashing library
+        start = time.perf_counter()
+        for _ in range(5):
+            hasher.encode(PASSWORD, hasher.salt())
+        hash_ms = (time.perf_counter() - start) / 5 * 1000
+
+        results = [register(client, f'signup-{name}-{i}@example.com') for i in range(signups)]
+        _, duplicate_queries = register(client, f'signup-{name}-0@example.com')
+
+        self.stdout.write(
+            f'{name:14} {hasher.algorithm:14} {hash_ms:8.1f} '
+            f'{statistics.median(r[0] for r in results) * 1000:10.1f} '
+            f'{statistics.mean(r[1] for r in results):8.1f} {duplicate_queries:18}'
+        )
@@ -0,0 +1,127 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Imports the WSGI app and serves one readiness request, the same work a
+# lambda cold start does before answering.
+BOOT_SCRIPT = '''
+import io, json, time
+started = time.perf_counter()
+from clothing_ecommerce.wsgi import application
+imported = time.perf_counter()
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': '/healthz/', 'QUERY_STRING': '',
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+    'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http', 'wsgi.errors': io.StringIO(),
+}
+statuses = []
+b''.join(application(environ, lambda status, headers: statuses.append(status)))
+done = time.perf_counter()
+print(json.dumps({'import': imported - started, 'first_request': done - imported, 'status': statuses[0]}))
+'''
+
+
+def parse_importtime(output):
+    """Return [(module, self_us, cumulative_us)] from ``-X importtime`` stderr"""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            modules.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return modules
+
+
+def summarize(values):
+    return {
+        'min': min(values),
+        'median': statistics.median(values),
+        'max': max(values),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Report per-package import cost and cold start time of the WSGI app'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', default=None,
+                            help='Settings module to profile (defaults to the current one)')
+        parser.add_argument('--top', type=int, default=15, help='Packages and modules to list')
+        parser.add_argument('--runs', type=int, default=5, help='Cold starts to time')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def run_python(self, profile, *args):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=profile)
+        env.pop('VERCEL', None)
+        result = subprocess.run(
+            [sys.executable, *args], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1] if result.stderr else 'startup failed')
+        return result
+
+    def handle(self, *args, **options):
+        profile = options['profile'] or os.environ['DJANGO_SETTINGS_MODULE']
+
+        modules = parse_importtime(
+            self.run_python(profile, '-X', 'importtime', '-c', 'import clothing_ecommerce.wsgi').stderr
+        )
+        packages = defaultdict(int)
+        for name, self_us, _ in modules:
+            packages[name.split('.')[0]] += self_us
+
+        runs = []
+        for _ in range(options['runs']):
+            started = time.perf_counter()
+            result = self.run_python(profile, '-c', BOOT_SCRIPT)
+            run = json.loads(result.stdout.strip().splitlines()[-1])
+            run['process'] = time.perf_counter() - started
+            runs.append(run)
+
+        report = {
+            'profile': profile,
+            'modules_imported': len(modules),
+            'import_ms_total': sum(packages.values()) / 1000,
+            'packages_ms': {
+                name: us / 1000
+                for name, us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]
+            },
+            'slowest_modules_ms': {
+                name: cumulative / 1000
+                for name, _, cumulative in sorted(modules, key=lambda item: -item[2])[:options['top']]
+            },
+            'cold_start_ms': {
+                key: {stat: value * 1000 for stat, value in summarize([run[key] for run in runs]).items()}
+                for key in ('import', 'first_request', 'process')
+            } if runs else {},
+            'readiness_status': runs[-1]['status'] if runs else None,
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"Profile: {profile}")
+        self.stdout.write(f"{report['modules_imported']} modules, {report['import_ms_total']:.1f} ms self import time")
+        self.stdout.write('\nImport time by package (self, ms):')
+        for name, ms in report['packages_ms'].items():
+            self.stdout.write(f'  {ms:9.1f}  {name}')
+        self.stdout.write('\nSlowest modules (cumulative, ms):')
+        for name, ms in report['slowest_modules_ms'].items():
+            self.stdout.write(f'  {ms:9.1f}  {name}')
+        if runs:
+            self.stdout.write(f"\nCold start over {len(runs)} run(s) (min / median / max, ms):")
+            for key, stats in report['cold_start_ms'].items():
+                self.stdout.write(f"  {key:14} {stats['min']:8.1f} {stats['median']:8.1f} {stats['max']:8.1f}")
+            self.stdout.write(f"  readiness: {report['readiness_status']}")
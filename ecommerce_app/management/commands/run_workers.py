@@ -0,0 +1,93 @@
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ecommerce_app import taskqueue
+
+
+def _process_worker(poll_interval, once):
+    django.setup()
+    from ecommerce_app import tasks  # noqa: F401  registers background tasks
+
+    stop = threading.Event()
+    # Ctrl-C reaches the whole process group; finish the current task and exit.
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *args: stop.set())
+    return taskqueue.work(stop, poll_interval, once)
+
+
+class Command(BaseCommand):
+    help = 'Run background task workers from the database-backed queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Number of workers')
+        parser.add_argument('--processes', action='store_true',
+                            help='Run workers in separate processes instead of threads')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is drained')
+        parser.add_argument('--purge-days', type=int, default=7,
+                            help='Delete finished tasks older than this many days on startup')
+        parser.add_argument('--stats', action='store_true',
+                            help='Print per-task latency for the last hour and exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.print_stats()
+            return
+
+        purged = taskqueue.prune_finished(timedelta(days=options['purge_days']))
+        requeued = taskqueue.requeue_stale()
+        self.stdout.write(f'Purged {purged} finished task(s), requeued {requeued} stale task(s).')
+
+        workers = options['workers']
+        if options['processes']:
+            # Forked workers must not share the parent's open database connections.
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=workers)
+            futures = [
+                executor.submit(_process_worker, options['poll_interval'], options['once'])
+                for _ in range(workers)
+            ]
+        else:
+            stop = threading.Event()
+            executor = ThreadPoolExecutor(max_workers=workers)
+            futures = [
+                executor.submit(taskqueue.work, stop, options['poll_interval'], options['once'])
+                for _ in range(workers)
+            ]
+
+        mode = 'process' if options['processes'] else 'thread'
+        self.stdout.write(f'Started {workers} {mode} worker(s).')
+        try:
+            processed = sum(future.result() for future in futures)
+        except KeyboardInterrupt:
+            if not options['processes']:
+                stop.set()
+            processed = sum(future.result() for future in futures)
+        finally:
+            executor.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} task(s).'))
+        self.print_stats()
+
+    def print_stats(self):
+        stats = taskqueue.latency_stats()
+        if not stats:
+            self.stdout.write('No tasks finished in the last hour.')
+            return
+
+        def ms(value):
+            return '-' if value is None else f'{value:.1f}'
+
+        self.stdout.write(f"{'task':30} {'done':>6} {'failed':>6} {'wait avg':>9} {'wait p95':>9} {'run avg':>9} {'run p95':>9}")
+        for name, row in sorted(stats.items()):
+            self.stdout.write(
+                f"{name:30} {row['done']:6} {row['failed']:6} {ms(row['wait_ms_mean']):>9} "
+                f"{ms(row['wait_ms_p95']):>9} {ms(row['run_ms_mean']):>9} {ms(row['run_ms_p95']):>9}"
+            )
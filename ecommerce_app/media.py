@@ -0,0 +1,131 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .storage import hashed_digest
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=3600'
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def etag_for(name, stat):
+    digest = hashed_digest(name)
+    if digest:
+        return f'"{digest}"'
+    return f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single ``bytes=`` range, ``None`` to send the
+    whole file (no header, or several ranges), or ``False`` if unsatisfiable.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve an uploaded file from MEDIA_ROOT with ETag, Range and long-lived
+    caching for content-addressed names.
+
+    With MEDIA_ACCEL_REDIRECT set (e.g. ``/protected-media/``) the body is
+    left to nginx via X-Accel-Redirect; otherwise FileResponse uses the
+    server's wsgi.file_wrapper, which is sendfile(2) under gunicorn.
+    """
+    # A path escaping MEDIA_ROOT raises SuspiciousFileOperation, answered with a 400.
+    full_path = safe_join(settings.MEDIA_ROOT, path)
+    try:
+        stat = os.stat(full_path)
+    except (OSError, ValueError):
+        # ValueError: the path contains a null byte.
+        raise Http404('Media file not found')
+    if not os.path.isfile(full_path):
+        raise Http404('Media file not found')
+
+    etag = etag_for(path, stat)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': IMMUTABLE if hashed_digest(path) else REVALIDATE,
+        'Accept-Ranges': 'bytes',
+    }
+
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in (tag.strip() for tag in if_none_match.split(',')) or if_none_match.strip() == '*':
+        response = HttpResponseNotModified()
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+
+    accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT', None)
+    if accel_prefix:
+        # nginx answers Range and conditional requests itself.
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + path.lstrip('/')
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if not if_range or if_range.strip() == etag:
+        byte_range = parse_range(request.headers.get('Range'), stat.st_size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(read_range(full_path, start, length), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(length)
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(stat.st_size)
+    for header, value in headers.items():
+        response[header] = value
+    return response
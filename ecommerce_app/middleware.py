@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import SimpleLazyObject
+from django.utils.regex_helper import _lazy_re_compile
+
+from .models import UserProfile
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+)
+
+
+def brotli_sequence(sequence, quality):
+    # Flush after every chunk so streamed HTML still reaches the browser early.
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware with brotli (when the ``brotli`` package is installed), a
+    COMPRESSION_MIN_SIZE threshold, and only for text-like content types, so
+    images and byte-range responses are left alone.
+    """
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '')
+        if response.status_code == 206 or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', 1024):
+            return response
+
+        if (
+            brotli is None or response.has_header('Content-Encoding')
+            or (response.streaming and response.is_async)
+            or not re_accepts_brotli.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+        if response.streaming:
+            response.streaming_content = brotli_sequence(response.streaming_content, quality)
+            del response.headers['Content-Length']
+        else:
+            compressed_content = brotli.compress(response.content, quality=quality)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+def get_profile(user):
+    """The user's UserProfile, or an unsaved one if they do not have one yet"""
+    if user.is_authenticated:
+        profile = UserProfile.objects.filter(user=user).first()
+        if profile is not None:
+            return profile
+        return UserProfile(user=user)
+    return UserProfile()
+
+
+class ProfileMiddleware:
+    """Sets ``request.profile``, loaded with one query the first time it is used"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.profile = SimpleLazyObject(lambda: get_profile(request.user))
+        return self.get_response(request)
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerce_app', '0002_cartitem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'category', 'price'], name='product_facet_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'price'], name='product_price_idx'),
+        ),
+    ]
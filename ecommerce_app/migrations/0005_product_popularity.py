@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerce_app', '0004_related_products'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductPopularity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('cart_adds', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='popularity_buckets', to='ecommerce_app.product')),
+            ],
+            options={
+                'verbose_name_plural': 'Product popularity',
+                'indexes': [models.Index(fields=['bucket'], name='popularity_bucket_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='productpopularity',
+            constraint=models.UniqueConstraint(fields=('product', 'bucket'), name='unique_product_popularity_bucket'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def record_existing_stock(apps, schema_editor):
+    # Opening balance, so the ledger sums to Product.stock on existing databases.
+    Product = apps.get_model('ecommerce_app', 'Product')
+    StockMovement = apps.get_model('ecommerce_app', 'StockMovement')
+    StockMovement.objects.bulk_create([
+        StockMovement(product_id=product_id, quantity=stock, reason='initial', applied=True)
+        for product_id, stock in Product.objects.exclude(stock=0).values_list('id', 'stock').iterator()
+    ], batch_size=500)
+
+
+def remove_existing_stock(apps, schema_editor):
+    apps.get_model('ecommerce_app', 'StockMovement').objects.filter(reason='initial', created_by=None).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ecommerce_app', '0012_order_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(help_text='Positive adds stock, negative removes it')),
+                ('reason', models.CharField(choices=[('initial', 'Initial stock'), ('restock', 'Restock'), ('sale', 'Sale'), ('return', 'Return'), ('adjustment', 'Adjustment')], default='adjustment', max_length=20)),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('applied', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['stock'], name='product_stock_idx'),
+        ),
+        migrations.AddField(
+            model_name='stockmovement',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='stockmovement',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='ecommerce_app.product'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['product', 'created_at'], name='stock_movement_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(condition=models.Q(('applied', False)), fields=['id'], name='stock_movement_pending_idx'),
+        ),
+        migrations.RunPython(record_existing_stock, remove_existing_stock),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:56
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerce_app', '0013_stock_movement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkerHeartbeat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('worker', models.CharField(max_length=100, unique=True)),
+                ('seen_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
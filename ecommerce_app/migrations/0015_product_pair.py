@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def reset_recommendation_runs(apps, schema_editor):
+    # Pair counts start empty, so the next build_recommendations must read
+    # every order again instead of only those after the last run.
+    apps.get_model('ecommerce_app', 'RecommendationRun').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerce_app', '0014_worker_heartbeat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductPair',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='ecommerce_app.product')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='ecommerce_app.product')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='productpair',
+            constraint=models.UniqueConstraint(fields=('product', 'other'), name='unique_product_pair'),
+        ),
+        migrations.RunPython(reset_recommendation_runs, migrations.RunPython.noop),
+    ]
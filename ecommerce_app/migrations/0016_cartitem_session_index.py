@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerce_app', '0015_product_pair'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['session_key', 'created_at'], name='cartitem_session_created_idx'),
+        ),
+    ]
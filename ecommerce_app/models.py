@@ -20,6 +20,7 @@ class Category(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -36,10 +37,63 @@ class Product(models.Model):
     image = models.ImageField(upload_to='products/', blank=True, null=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_active', 'category', 'price'], name='product_facet_idx'),
+            models.Index(fields=['is_active', 'price'], name='product_price_idx'),
+            models.Index(fields=['created_at'], name='product_created_idx'),
+            models.Index(fields=['updated_at'], name='product_updated_idx'),
+            models.Index(fields=['stock'], condition=models.Q(is_active=True), name='product_stock_idx'),
+        ]
+
+class StockMovement(models.Model):
+    REASON_CHOICES = [
+        ('initial', 'Initial stock'),
+        ('restock', 'Restock'),
+        ('sale', 'Sale'),
+        ('return', 'Return'),
+        ('adjustment', 'Adjustment'),
+    ]
+
+    product = models.ForeignKey(Product, related_name='stock_movements', on_delete=models.CASCADE)
+    quantity = models.IntegerField(help_text='Positive adds stock, negative removes it')
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES, default='adjustment')
+    note = models.CharField(max_length=200, blank=True)
+    created_by = models.ForeignKey(User, null=True, blank=True, related_name='+', on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(default=timezone.now)
+    # False until compact_stock has added the quantity to Product.stock.
+    applied = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.product_id}: {self.quantity:+d} ({self.reason})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'created_at'], name='stock_movement_product_idx'),
+            models.Index(fields=['id'], condition=models.Q(applied=False), name='stock_movement_pending_idx'),
+        ]
+
+class CatalogVersion(models.Model):
+    version = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Catalog v{self.version}"
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls, **kwargs):
+        if not cls.objects.filter(pk=1).update(version=models.F('version') + 1, updated_at=timezone.now()):
+            cls.objects.get_or_create(pk=1)
+
 class Order(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -58,6 +112,28 @@ class Order(models.Model):
     def __str__(self):
         return f"Order #{self.id} - {self.user.username}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='order_created_idx'),
+            models.Index(fields=['user', 'created_at'], name='order_user_created_idx'),
+        ]
+
+class OrderStatusHistory(models.Model):
+    order = models.ForeignKey(Order, related_name='status_history', on_delete=models.CASCADE)
+    from_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    changed_by = models.ForeignKey(User, null=True, blank=True, related_name='+', on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Order #{self.order_id}: {self.from_status} -> {self.to_status}"
+
+    class Meta:
+        verbose_name_plural = "Order status history"
+        indexes = [
+            models.Index(fields=['order', 'created_at'], name='order_status_history_idx'),
+        ]
+
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -67,6 +143,10 @@ class OrderItem(models.Model):
     def __str__(self):
         return f"{self.product.name} x {self.quantity}"
 
+    @property
+    def total_price(self):
+        return self.price * self.quantity
+
 class CartItem(models.Model):
     session_key = models.CharField(max_length=40)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -78,4 +158,150 @@ class CartItem(models.Model):
     
     @property
     def total_price(self):
-        return self.product.price * self.quantity
\ No newline at end of file
+        return self.product.price * self.quantity
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='cartitem_created_idx'),
+            models.Index(fields=['session_key', 'created_at'], name='cartitem_session_created_idx'),
+        ]
+
+class RelatedProduct(models.Model):
+    product = models.ForeignKey(Product, related_name='related_products', on_delete=models.CASCADE)
+    related = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+    score = models.PositiveIntegerField(default=0)
+    rank = models.PositiveSmallIntegerField()
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} ({self.score})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'related'], name='unique_related_product'),
+        ]
+        indexes = [
+            models.Index(fields=['product', 'rank'], name='related_product_rank_idx'),
+        ]
+
+class ProductPair(models.Model):
+    # Each pair bought together is stored once, with product_id < other_id.
+    product = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+    other = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.product_id} + {self.other_id} ({self.count})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'other'], name='unique_product_pair'),
+        ]
+
+class RecommendationRun(models.Model):
+    last_order_id = models.BigIntegerField(default=0)
+    pairs_updated = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Recommendations up to order #{self.last_order_id}"
+
+class ProductPopularity(models.Model):
+    product = models.ForeignKey(Product, related_name='popularity_buckets', on_delete=models.CASCADE)
+    bucket = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    cart_adds = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.bucket:%Y-%m-%d %H:00}"
+
+    class Meta:
+        verbose_name_plural = "Product popularity"
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'bucket'], name='unique_product_popularity_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket'], name='popularity_bucket_idx'),
+        ]
+
+class Task(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='task_ready_idx'),
+            models.Index(fields=['name', 'finished_at'], name='task_metrics_idx'),
+        ]
+
+class WorkerHeartbeat(models.Model):
+    worker = models.CharField(max_length=100, unique=True)
+    seen_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.worker} @ {self.seen_at:%Y-%m-%d %H:%M:%S}"
+
+class ArchivedOrder(models.Model):
+    # Keeps the id of the order it replaces, so order links keep working.
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    status_history = models.JSONField(default=list, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Archived order #{self.id} - {self.user.username}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='archived_order_user_idx'),
+            models.Index(fields=['created_at'], name='archived_order_created_idx'),
+        ]
+
+class ArchivedOrderItem(models.Model):
+    order = models.ForeignKey(ArchivedOrder, related_name='items', on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, null=True, blank=True, on_delete=models.SET_NULL)
+    product_name = models.CharField(max_length=200)
+    category_name = models.CharField(max_length=100, blank=True)
+    quantity = models.IntegerField(default=1)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.product_name} x {self.quantity}"
+
+    @property
+    def total_price(self):
+        return self.price * self.quantity
+
+class ArchivedCartItem(models.Model):
+    session_key = models.CharField(max_length=40)
+    product = models.ForeignKey(Product, null=True, blank=True, on_delete=models.SET_NULL)
+    quantity = models.IntegerField(default=1)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.session_key}: {self.product_id} x {self.quantity}"
@@ -0,0 +1,145 @@
+import atexit
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Case, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Product, ProductPopularity
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SIZE = timedelta(hours=1)
+CART_ADD_WEIGHT = 5
+
+# (window, step, half-life) for each sort order. Weights are stepped per
+# ``step`` so the decay expression stays a short CASE in SQL.
+SCORES = {
+    'popular': (timedelta(days=30), timedelta(days=1), timedelta(days=7)),
+    'trending': (timedelta(hours=48), timedelta(hours=1), timedelta(hours=12)),
+}
+RETENTION = timedelta(days=31)
+
+FLUSH_INTERVAL = getattr(settings, 'POPULARITY_FLUSH_INTERVAL', 30)
+MAX_BUFFERED = getattr(settings, 'POPULARITY_MAX_BUFFERED', 1000)
+
+
+def bucket_start(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class CounterBuffer:
+    """
+    Per-process view and add-to-cart counters.
+
+    Events are aggregated in memory by (product, hour) and written with one
+    upsert per flush, so a page view costs a dict update instead of an UPDATE.
+    Counts buffered in a process that dies before flushing are lost, which is
+    acceptable for ranking signals.
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, max_buffered=MAX_BUFFERED):
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.last_flush = time.monotonic()
+        self.last_prune = None
+
+    def record(self, product_id, views=0, cart_adds=0):
+        key = (product_id, bucket_start(timezone.now()))
+        with self.lock:
+            current = self.counts.get(key, (0, 0))
+            self.counts[key] = (current[0] + views, current[1] + cart_adds)
+            due = (
+                len(self.counts) >= self.max_buffered
+                or time.monotonic() - self.last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, {}
+            self.last_flush = time.monotonic()
+        if not counts:
+            return 0
+        # Runs inside whichever request is due to flush; a failed write costs
+        # these counts, never that request.
+        try:
+            with transaction.atomic():
+                write_counts(counts)
+                self.prune()
+        except DatabaseError:
+            logger.exception('Could not write %s popularity count(s)', len(counts))
+            return 0
+        return len(counts)
+
+    def prune(self):
+        now = timezone.now()
+        if self.last_prune and now - self.last_prune < BUCKET_SIZE:
+            return
+        self.last_prune = now
+        ProductPopularity.objects.filter(bucket__lt=now - RETENTION).delete()
+
+
+def write_counts(counts):
+    """Upsert {(product_id, bucket): (views, cart_adds)}, skipping products deleted since"""
+    table = connection.ops.quote_name(ProductPopularity._meta.db_table)
+    products = connection.ops.quote_name(Product._meta.db_table)
+    # SQLite needs the WHERE clause to parse ON CONFLICT after INSERT ... SELECT.
+    sql = (
+        f'INSERT INTO {table} (product_id, bucket, views, cart_adds) '
+        f'SELECT %s, %s, %s, %s WHERE EXISTS (SELECT 1 FROM {products} WHERE id = %s) '
+        f'ON CONFLICT (product_id, bucket) DO UPDATE SET '
+        f'views = {table}.views + excluded.views, '
+        f'cart_adds = {table}.cart_adds + excluded.cart_adds'
+    )
+    params = [
+        (product_id, connection.ops.adapt_datetimefield_value(bucket), views, cart_adds, product_id)
+        for (product_id, bucket), (views, cart_adds) in counts.items()
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+buffer = CounterBuffer()
+atexit.register(buffer.flush)
+
+
+def record_view(product_id):
+    buffer.record(product_id, views=1)
+
+
+def record_cart_add(product_id, quantity=1):
+    buffer.record(product_id, cart_adds=quantity)
+
+
+def popularity_score(kind='popular', now=None):
+    """Decayed activity score expression for annotating Product querysets"""
+    window, step, half_life = SCORES[kind]
+    now = now or timezone.now()
+    start = bucket_start(now - window)
+
+    whens = []
+    age = timedelta(0)
+    while age < window:
+        weight = 0.5 ** (age / half_life)
+        whens.append(When(popularity_buckets__bucket__gte=bucket_start(now - age - step), then=Value(weight)))
+        age += step
+    weight = Case(*whens, default=Value(0.0), output_field=FloatField())
+    activity = F('popularity_buckets__views') + CART_ADD_WEIGHT * F('popularity_buckets__cart_adds')
+
+    return Coalesce(
+        Sum(weight * activity, filter=Q(popularity_buckets__bucket__gte=start), output_field=FloatField()),
+        Value(0.0),
+    )
+
+
+def order_by_popularity(queryset, kind='popular'):
+    return queryset.annotate(popularity=popularity_score(kind)).order_by('-popularity', '-created_at')
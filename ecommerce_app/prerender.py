@@ -0,0 +1,136 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.db.models import Q
+from django.http import QueryDict
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Category, Product
+from .views import home_context, product_detail_context, products_context
+
+MANIFEST_NAME = 'manifest.json'
+# Below this many products forking workers costs more than it saves.
+POOL_THRESHOLD = 200
+BATCH_SIZE = 100
+
+
+def output_root():
+    return getattr(settings, 'PRERENDER_ROOT', settings.BASE_DIR / 'staticfiles_build' / 'prerendered')
+
+
+def product_page(product_id):
+    return os.path.join('product', f'{product_id}.html')
+
+
+def category_page(category_id):
+    return os.path.join('products', f'category-{category_id}.html')
+
+
+def render_page(template, context, path):
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    return render_to_string(template, {**context, 'prerendered': True}, request=request)
+
+
+def write_page(root, relative_path, html):
+    path = os.path.join(root, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    os.replace(tmp_path, path)
+
+
+def render_listings(root):
+    write_page(root, 'index.html', render_page('home.html', home_context(), '/'))
+    write_page(root, os.path.join('products', 'index.html'),
+               render_page('products.html', products_context(QueryDict()), '/products/'))
+    pages = 2
+    for category_id in Category.objects.values_list('id', flat=True):
+        params = QueryDict(f'category={category_id}')
+        write_page(root, category_page(category_id),
+                   render_page('products.html', products_context(params), f'/products/?{params.urlencode()}'))
+        pages += 1
+    return pages
+
+
+def render_products(root, product_ids):
+    products = Product.objects.select_related('category').filter(id__in=product_ids, is_active=True)
+    for product in products:
+        write_page(root, product_page(product.id),
+                   render_page('product_detail.html', product_detail_context(product), f'/product/{product.id}/'))
+    return len(products)
+
+
+def _init_worker():
+    django.setup()
+
+
+def render_products_parallel(root, product_ids, workers=None):
+    batches = [product_ids[i:i + BATCH_SIZE] for i in range(0, len(product_ids), BATCH_SIZE)]
+    if len(product_ids) < POOL_THRESHOLD or workers == 1:
+        return sum(render_products(root, batch) for batch in batches)
+
+    # Forked workers must not share the parent's open database connections.
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return sum(pool.map(render_products, [root] * len(batches), batches))
+
+
+def load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    manifest['built_at'] = parse_datetime(manifest['built_at'])
+    return manifest
+
+
+def prerender_catalog(root=None, full=False, workers=None):
+    """
+    Render home, product listings and product pages to static HTML.
+
+    Unless ``full`` is set, only products (or their categories) edited since
+    the previous build are re-rendered, and pages of products that were
+    removed or deactivated are deleted. Listing pages are always rebuilt.
+    """
+    root = str(root or output_root())
+    started = timezone.now()
+    manifest = None if full else load_manifest(root)
+
+    active_ids = set(Product.objects.filter(is_active=True).values_list('id', flat=True))
+    if manifest:
+        previous_ids = set(manifest['products'])
+        since = manifest['built_at']
+        changed = Product.objects.filter(is_active=True).filter(
+            Q(updated_at__gte=since) | Q(category__updated_at__gte=since)
+        )
+        to_render = set(changed.values_list('id', flat=True)) | (active_ids - previous_ids)
+        removed = previous_ids - active_ids
+    else:
+        to_render = active_ids
+        removed = set()
+
+    for product_id in removed:
+        try:
+            os.remove(os.path.join(root, product_page(product_id)))
+        except FileNotFoundError:
+            pass
+
+    listings = render_listings(root)
+    rendered = render_products_parallel(root, sorted(to_render), workers)
+
+    write_page(root, MANIFEST_NAME, json.dumps({
+        'built_at': started.isoformat(),
+        'products': sorted(active_ids),
+    }))
+    return {'listings': listings, 'products': rendered, 'removed': len(removed)}
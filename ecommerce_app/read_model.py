@@ -0,0 +1,152 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from .models import CatalogVersion, Category, Product
+
+VERSION_CHECK_INTERVAL = getattr(settings, 'CATALOG_VERSION_CHECK_INTERVAL', 5)
+
+PRODUCT_FIELDS = [
+    'id', 'name', 'description', 'category_id', 'price', 'stock', 'image',
+    'is_active', 'created_at',
+]
+
+
+class ImageRef:
+    __slots__ = ('name', 'url')
+
+    def __init__(self, name):
+        self.name = name
+        self.url = default_storage.url(name)
+
+    def __str__(self):
+        return self.name
+
+
+class CategoryRecord:
+    __slots__ = ('id', 'name', 'description')
+
+    def __init__(self, id, name, description):
+        self.id = id
+        self.name = name
+        self.description = description
+
+    def __str__(self):
+        return self.name
+
+
+class ProductRecord:
+    """Read-only stand-in for Product with the attributes the catalog templates use"""
+
+    __slots__ = ('id', 'name', 'description', 'category', 'price', 'stock', 'image', 'is_active', 'created_at')
+
+    def __init__(self, id, name, description, category, price, stock, image, is_active, created_at):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.category = category
+        self.price = price
+        self.stock = stock
+        self.image = image
+        self.is_active = is_active
+        self.created_at = created_at
+
+    @property
+    def category_id(self):
+        return self.category.id
+
+    def __str__(self):
+        return self.name
+
+
+class CatalogSnapshot:
+    """Active products and all categories, indexed by id and by category"""
+
+    __slots__ = ('version', 'categories', 'products', 'by_id', 'by_category')
+
+    def __init__(self, version, categories, products):
+        self.version = version
+        self.categories = categories
+        self.products = products
+        self.by_id = {product.id: product for product in products}
+        self.by_category = {}
+        for product in products:
+            self.by_category.setdefault(product.category.id, []).append(product)
+
+    @classmethod
+    def load(cls, version):
+        categories = {
+            id: CategoryRecord(id, name, description)
+            for id, name, description in Category.objects.values_list('id', 'name', 'description')
+        }
+        products = [
+            ProductRecord(
+                id, name, description, categories[category_id], price, stock,
+                ImageRef(image) if image else None, is_active, created_at
+            )
+            for id, name, description, category_id, price, stock, image, is_active, created_at in (
+                Product.objects.filter(is_active=True).order_by('id')
+                .values_list(*PRODUCT_FIELDS).iterator(chunk_size=2000)
+            )
+        ]
+        return cls(version, list(categories.values()), products)
+
+    def get(self, product_id):
+        return self.by_id.get(product_id)
+
+    def many(self, product_ids):
+        return [self.by_id[product_id] for product_id in product_ids if product_id in self.by_id]
+
+    def filter(self, filters):
+        """Same semantics as facets.filter_products, without touching the database"""
+        products = self.by_category.get(filters['category'], []) if filters['category'] else self.products
+        min_price, max_price = filters['min_price'], filters['max_price']
+        include_max = not filters['price']
+        return [
+            product for product in products
+            if (not filters['in_stock'] or product.stock > 0)
+            and (min_price is None or product.price >= min_price)
+            and (max_price is None or product.price < max_price or include_max and product.price == max_price)
+        ]
+
+
+class ReadModel:
+    """
+    Per-process catalog snapshot, reloaded when CatalogVersion moves.
+
+    The version row is checked at most every VERSION_CHECK_INTERVAL seconds,
+    so edits show up after that delay at worst.
+    """
+
+    def __init__(self, check_interval=VERSION_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.checked_at = 0
+
+    def get(self):
+        snapshot = self.snapshot
+        if snapshot is not None and time.monotonic() - self.checked_at < self.check_interval:
+            return snapshot
+
+        with self.lock:
+            if self.snapshot is not None and time.monotonic() - self.checked_at < self.check_interval:
+                return self.snapshot
+            version = CatalogVersion.current()
+            if self.snapshot is None or self.snapshot.version != version:
+                self.snapshot = CatalogSnapshot.load(version)
+            self.checked_at = time.monotonic()
+            return self.snapshot
+
+
+read_model = ReadModel()
+
+
+def enabled():
+    return getattr(settings, 'CATALOG_READ_MODEL', False)
+
+
+def current_snapshot():
+    return read_model.get()
@@ -0,0 +1,134 @@
+import heapq
+from collections import Counter, defaultdict
+from itertools import combinations, groupby
+from operator import itemgetter
+
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .models import ArchivedOrderItem, OrderItem, ProductPair, RecommendationRun, RelatedProduct
+
+TOP_K = 8
+CHUNK_SIZE = 2000
+# Stays under SQLite's bound-parameter limit for IN (...) lookups.
+ID_BATCH_SIZE = 500
+
+
+def order_baskets(after_order_id=0):
+    """
+    Yield (order_id, product ids) for every non-cancelled order after the
+    given id, live and archived (archived orders keep their ids).
+    """
+    sources = [
+        OrderItem.objects.filter(order_id__gt=after_order_id).exclude(order__status='cancelled'),
+        # Items of since-deleted products have no product_id left.
+        ArchivedOrderItem.objects.filter(order_id__gt=after_order_id, product__isnull=False)
+        .exclude(order__status='cancelled'),
+    ]
+    rows = heapq.merge(*(
+        items.order_by('order_id').values_list('order_id', 'product_id').iterator(chunk_size=CHUNK_SIZE)
+        for items in sources
+    ), key=itemgetter(0))
+    for order_id, items in groupby(rows, key=itemgetter(0)):
+        yield order_id, sorted({product_id for _, product_id in items})
+
+
+def pair_counts(baskets):
+    """
+    Sparse co-occurrence counts as Counter({(product_id, other_id): count})
+    with product_id < other_id.
+
+    Only pairs that were actually bought together are stored, so memory grows
+    with the number of distinct pairs rather than with products squared.
+    """
+    counts = Counter()
+    last_order_id = None
+    for order_id, products in baskets:
+        last_order_id = order_id
+        counts.update(combinations(products, 2))
+    return counts, last_order_id
+
+
+def write_pair_counts(counts):
+    table = connection.ops.quote_name(ProductPair._meta.db_table)
+    sql = (
+        f'INSERT INTO {table} (product_id, other_id, count) VALUES (%s, %s, %s) '
+        f'ON CONFLICT (product_id, other_id) DO UPDATE SET count = {table}.count + excluded.count'
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [(a, b, count) for (a, b), count in counts.items()])
+
+
+def stored_scores(product_ids):
+    """{product_id: {related_id: count}} from every stored pair involving the products"""
+    scores = defaultdict(dict)
+    for product_id, other_id, count in ProductPair.objects.filter(
+        product_id__in=product_ids
+    ).values_list('product_id', 'other_id', 'count'):
+        scores[product_id][other_id] = count
+    for product_id, other_id, count in ProductPair.objects.filter(
+        other_id__in=product_ids
+    ).values_list('product_id', 'other_id', 'count'):
+        scores[other_id][product_id] = count
+    return scores
+
+
+def top_related(scores, k=TOP_K):
+    # Ties are broken by product id so reruns store the same ranking.
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+@transaction.atomic
+def build_recommendations(full=False, k=TOP_K):
+    """
+    Add orders placed since the last run to the pair counts and re-rank the
+    products that appear in them.
+
+    ProductPair keeps the full count of every pair, not just the top K, so
+    an incremental run stores exactly what a ``full=True`` rebuild would.
+    """
+    if full:
+        ProductPair.objects.all().delete()
+        RelatedProduct.objects.all().delete()
+        after_order_id = 0
+    else:
+        after_order_id = RecommendationRun.objects.aggregate(
+            last=Max('last_order_id')
+        )['last'] or 0
+
+    counts, last_order_id = pair_counts(order_baskets(after_order_id))
+    if last_order_id is None:
+        return None
+    write_pair_counts(counts)
+
+    product_ids = sorted({product_id for pair in counts for product_id in pair})
+    stored = 0
+    for start in range(0, len(product_ids), ID_BATCH_SIZE):
+        batch = product_ids[start:start + ID_BATCH_SIZE]
+        RelatedProduct.objects.filter(product_id__in=batch).delete()
+        rows = [
+            RelatedProduct(product_id=product_id, related_id=related_id, score=score, rank=rank)
+            for product_id, scores in stored_scores(batch).items()
+            for rank, (related_id, score) in enumerate(top_related(scores, k), start=1)
+        ]
+        RelatedProduct.objects.bulk_create(rows, batch_size=CHUNK_SIZE)
+        stored += len(rows)
+
+    return RecommendationRun.objects.create(last_order_id=last_order_id, pairs_updated=stored)
+
+
+def related_products(product, limit=4):
+    links = (
+        RelatedProduct.objects
+        .filter(product=product, related__is_active=True)
+        .select_related('related')
+        .order_by('rank')[:limit]
+    )
+    return [link.related for link in links]
+
+
+def related_product_ids(product_id):
+    return list(
+        RelatedProduct.objects.filter(product_id=product_id)
+        .order_by('rank').values_list('related_id', flat=True)
+    )
@@ -0,0 +1,61 @@
+import hashlib
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+
+# <upload_to>/ab/<sha256><ext>
+HASHED_NAME_RE = re.compile(r'(?:^|/)[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})(?:\.[\w]+)?$')
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def hashed_digest(name):
+    """The content hash embedded in a content-addressed name, or None"""
+    match = HASHED_NAME_RE.search(name)
+    return match.group('digest') if match else None
+
+
+class ContentAddressedMixin:
+    """
+    Store each file under the SHA-256 of its content, keeping the upload
+    directory and extension: ``products/3f/3fa9...c1.jpg``.
+
+    Uploading bytes that are already stored returns the existing name without
+    writing anything, and because a name never changes content, it can be
+    cached forever.
+    """
+
+    def _save(self, name, content):
+        digest = content_hash(content)
+        directory, filename = posixpath.split(name.replace('\\', '/'))
+        extension = posixpath.splitext(filename)[1].lower()
+        name = posixpath.join(directory, digest[:2], digest + extension)
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+class ContentAddressedStorage(ContentAddressedMixin, FileSystemStorage):
+    pass
+
+
+def delete_unreferenced(storage, name):
+    """Delete ``name`` unless another product image or profile photo still points at it"""
+    from .models import Product, UserProfile
+
+    if not name:
+        return False
+    if Product.objects.filter(image=name).exists() or UserProfile.objects.filter(profile_photo=name).exists():
+        return False
+    storage.delete(name)
+    return True
@@ -0,0 +1,19 @@
+"""
+Content-addressed media on S3 or any S3-compatible service (MinIO, R2,
+a local moto server). Needs ``django-storages`` and ``boto3``, which are
+only installed when MEDIA_STORAGE=s3.
+"""
+
+from storages.backends.s3 import S3Storage
+
+from .storage import ContentAddressedMixin, hashed_digest
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class ContentAddressedS3Storage(ContentAddressedMixin, S3Storage):
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+        if hashed_digest(name):
+            params.setdefault('CacheControl', IMMUTABLE)
+        return params
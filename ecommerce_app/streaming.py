@@ -0,0 +1,54 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+ROWS_MARKER = '<!-- streamed rows -->'
+
+
+def should_stream(row_count):
+    """Stream pages with at least STREAMING_HTML_MIN_ROWS rows (None turns streaming off)"""
+    min_rows = getattr(settings, 'STREAMING_HTML_MIN_ROWS', 500)
+    return min_rows is not None and row_count >= min_rows
+
+
+def chunked(rows, size):
+    if isinstance(rows, QuerySet):
+        rows = rows.iterator(chunk_size=size)
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def stream_template(request, template_name, context, rows_template, rows_name):
+    """
+    Render ``template_name`` with the row list replaced by a marker, then stream
+    everything before the marker, the rows rendered ``rows_template`` a chunk at
+    a time, and the rest of the page. ``rows_template`` numbers rows with
+    ``forloop.counter|add:row_offset``.
+
+    The page shell is rendered before the response is returned, so the CSRF
+    cookie and consumed messages are handled by middleware as usual; only the
+    rows are rendered while the response is being sent.
+    """
+    page = render_to_string(template_name, {**context, 'streamed_rows': mark_safe(ROWS_MARKER)}, request)
+    head, tail = page.split(ROWS_MARKER, 1)
+    template = get_template(rows_template)
+    chunk_size = getattr(settings, 'STREAMING_HTML_CHUNK_SIZE', 200)
+
+    def content():
+        yield head
+        # row_offset continues forloop.counter across chunks.
+        row_offset = 0
+        for chunk in chunked(context[rows_name], chunk_size):
+            yield template.render({**context, rows_name: chunk, 'row_offset': row_offset}, request)
+            row_offset += len(chunk)
+        yield tail
+
+    return StreamingHttpResponse(content(), content_type='text/html; charset=utf-8')
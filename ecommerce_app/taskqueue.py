@@ -0,0 +1,200 @@
+import logging
+import os
+import socket
+import statistics
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task, WorkerHeartbeat
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+# A running task whose worker has not finished it within this time is
+# assumed dead and handed out again.
+VISIBILITY_TIMEOUT = timedelta(minutes=10)
+CLAIM_BATCH = 10
+# Workers record a heartbeat and requeue stale tasks this often; a worker
+# silent for HEARTBEAT_TIMEOUT is assumed gone.
+HEARTBEAT_INTERVAL = timedelta(seconds=30)
+HEARTBEAT_TIMEOUT = timedelta(minutes=2)
+
+
+def task(name=None, max_attempts=3):
+    """
+    Register a function as a task.
+
+    It is called with the payload as keyword arguments; a JSON-serializable
+    return value is stored on the task row.
+    """
+    def register(func):
+        func.task_name = name or f'{func.__module__}.{func.__name__}'
+        func.max_attempts = max_attempts
+        registry[func.task_name] = func
+        return func
+    return register
+
+
+def enqueue(func, key=None, delay=None, **payload):
+    """
+    Queue ``func(**payload)`` and return the Task row.
+
+    With an idempotency ``key``, enqueueing the same key again returns the
+    existing task instead of adding a second one.
+    """
+    fields = {
+        'name': func.task_name,
+        'payload': payload,
+        'max_attempts': func.max_attempts,
+        'run_after': timezone.now() + (delay or timedelta(0)),
+    }
+    if key is None:
+        return Task.objects.create(**fields)
+    try:
+        with transaction.atomic():
+            return Task.objects.create(idempotency_key=key, **fields)
+    except IntegrityError:
+        return Task.objects.get(idempotency_key=key)
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+def requeue_stale():
+    return Task.objects.filter(
+        status='running', started_at__lt=timezone.now() - VISIBILITY_TIMEOUT
+    ).update(status='queued', locked_by='')
+
+
+def heartbeat(worker):
+    WorkerHeartbeat.objects.update_or_create(worker=worker, defaults={'seen_at': timezone.now()})
+
+
+def workers_alive():
+    """Whether any worker has sent a heartbeat within HEARTBEAT_TIMEOUT"""
+    return WorkerHeartbeat.objects.filter(seen_at__gte=timezone.now() - HEARTBEAT_TIMEOUT).exists()
+
+
+def claim(worker, limit=CLAIM_BATCH):
+    """Claim up to ``limit`` due tasks; each claim is a conditional UPDATE so only one worker wins"""
+    now = timezone.now()
+    candidates = Task.objects.filter(status='queued', run_after__lte=now).order_by('run_after', 'id')
+    claimed = []
+    for task_id in candidates.values_list('id', flat=True)[:limit]:
+        won = Task.objects.filter(id=task_id, status='queued').update(
+            status='running', locked_by=worker, started_at=now, attempts=F('attempts') + 1
+        )
+        if won:
+            claimed.append(Task.objects.get(id=task_id))
+    return claimed
+
+
+def execute(task_row):
+    func = registry.get(task_row.name)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown task {task_row.name!r}')
+        result = func(**task_row.payload)
+        # Inside the try: a result that cannot be stored fails the task
+        # instead of leaving it 'running'. The savepoint keeps an enclosing
+        # transaction usable for recording that failure.
+        with transaction.atomic():
+            Task.objects.filter(id=task_row.id).update(
+                status='done', result=result, last_error='', finished_at=timezone.now()
+            )
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Task %s #%s failed (attempt %s)', task_row.name, task_row.id, task_row.attempts)
+        if task_row.attempts < task_row.max_attempts:
+            # Exponential backoff: 2s, 4s, 8s, ...
+            Task.objects.filter(id=task_row.id).update(
+                status='queued', locked_by='', last_error=error,
+                run_after=timezone.now() + timedelta(seconds=2 ** task_row.attempts)
+            )
+        else:
+            Task.objects.filter(id=task_row.id).update(
+                status='failed', last_error=error, finished_at=timezone.now()
+            )
+        return False
+    return True
+
+
+def work(stop, poll_interval=1.0, once=False):
+    """Claim and run tasks until ``stop`` is set (or, with ``once``, until the queue is drained)"""
+    worker = worker_id()
+    processed = 0
+    last_heartbeat = None
+    while not stop.is_set():
+        close_old_connections()
+        if last_heartbeat is None or time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL.total_seconds():
+            # Also picks up tasks of workers that died while others keep running.
+            heartbeat(worker)
+            requeue_stale()
+            last_heartbeat = time.monotonic()
+        tasks = claim(worker)
+        for task_row in tasks:
+            execute(task_row)
+            processed += 1
+        if not tasks:
+            if once:
+                break
+            stop.wait(poll_interval)
+    close_old_connections()
+    return processed
+
+
+def latest_result(func):
+    """Return (result, finished_at) of the most recent successful run of ``func``"""
+    row = (
+        Task.objects.filter(name=func.task_name, status='done')
+        .order_by('-finished_at').values_list('result', 'finished_at').first()
+    )
+    return row or (None, None)
+
+
+def prune_finished(older_than=timedelta(days=7)):
+    cutoff = timezone.now() - older_than
+    WorkerHeartbeat.objects.filter(seen_at__lt=cutoff).delete()
+    return Task.objects.filter(status__in=['done', 'failed'], finished_at__lt=cutoff).delete()[0]
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def latency_stats(since=timedelta(hours=1)):
+    """Per task name: counts, queue wait (created -> started) and run time (started -> finished) in ms"""
+    rows = Task.objects.filter(
+        finished_at__gte=timezone.now() - since
+    ).values_list('name', 'status', 'created_at', 'started_at', 'finished_at')
+
+    grouped = {}
+    for name, status, created_at, started_at, finished_at in rows.iterator():
+        stats = grouped.setdefault(name, {'done': 0, 'failed': 0, 'wait': [], 'run': []})
+        stats[status] += 1
+        if started_at:
+            stats['wait'].append((started_at - created_at).total_seconds() * 1000)
+            stats['run'].append((finished_at - started_at).total_seconds() * 1000)
+
+    return {
+        name: {
+            'done': stats['done'],
+            'failed': stats['failed'],
+            'wait_ms_mean': statistics.fmean(stats['wait']) if stats['wait'] else None,
+            'wait_ms_p95': percentile(stats['wait'], 95),
+            'run_ms_mean': statistics.fmean(stats['run']) if stats['run'] else None,
+            'run_ms_p95': percentile(stats['run'], 95),
+        }
+        for name, stats in grouped.items()
+    }
@@ -0,0 +1,102 @@
+import time
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db.models import Sum
+from django.utils import timezone
+
+from .archive import archive_carts, archive_orders
+from .inventory import compact_stock
+from .models import ArchivedOrder, Order, Product, UserProfile
+from .recommendations import build_recommendations
+from .storage import delete_unreferenced
+from .taskqueue import enqueue, latest_result, task, workers_alive
+
+PROFILE_PHOTO_SIZE = (512, 512)
+# Dashboard metrics older than this are refreshed in the background...
+METRICS_REFRESH_AFTER = timedelta(minutes=1)
+# ...and past this (no worker running) they are computed inline.
+METRICS_MAX_AGE = timedelta(minutes=10)
+METRICS_CACHE_KEY = 'dashboard_metrics'
+
+
+@task(name='profile_photo.optimize')
+def optimize_profile_photo(profile_id):
+    """Downscale an uploaded profile photo so dashboards do not load camera-sized originals"""
+    from PIL import Image
+
+    profile = UserProfile.objects.filter(id=profile_id).first()
+    if profile is None or not profile.profile_photo:
+        return None
+
+    with profile.profile_photo.open('rb') as f:
+        image = Image.open(f)
+        image.load()
+    if image.width <= PROFILE_PHOTO_SIZE[0] and image.height <= PROFILE_PHOTO_SIZE[1]:
+        return {'resized': False}
+
+    image_format = image.format or 'JPEG'
+    image.thumbnail(PROFILE_PHOTO_SIZE)
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, optimize=True)
+
+    old_name = profile.profile_photo.name
+    profile.profile_photo.save(old_name.rsplit('/', 1)[-1], ContentFile(buffer.getvalue()), save=False)
+    UserProfile.objects.filter(id=profile_id).update(profile_photo=profile.profile_photo.name)
+    delete_unreferenced(profile.profile_photo.storage, old_name)
+    return {'resized': True, 'size': list(image.size)}
+
+
+@task(name='dashboard.metrics')
+def refresh_dashboard_metrics():
+    return {
+        'total_users': UserProfile.objects.count(),
+        'active_users': UserProfile.objects.filter(is_active=True).count(),
+        'total_products': Product.objects.count(),
+        'total_orders': Order.objects.count() + ArchivedOrder.objects.count(),
+        'total_revenue': str(
+            (Order.objects.aggregate(Sum('total_amount'))['total_amount__sum'] or 0)
+            + (ArchivedOrder.objects.aggregate(Sum('total_amount'))['total_amount__sum'] or 0)
+        ),
+    }
+
+
+def dashboard_metrics():
+    metrics = cache.get(METRICS_CACHE_KEY)
+    if metrics is not None:
+        return metrics
+    metrics, finished_at = latest_result(refresh_dashboard_metrics)
+    age = timezone.now() - finished_at if finished_at else None
+    # Without a worker (e.g. on Vercel) nothing would ever run the task.
+    if (age is None or age > METRICS_REFRESH_AFTER) and workers_alive():
+        enqueue(refresh_dashboard_metrics, key=f'dashboard.metrics:{int(time.time() // 60)}')
+    if age is None or age > METRICS_MAX_AGE:
+        metrics = refresh_dashboard_metrics()
+        cache.set(METRICS_CACHE_KEY, metrics, METRICS_REFRESH_AFTER.total_seconds())
+    return metrics
+
+
+def enqueue_profile_photo(profile):
+    if profile.profile_photo:
+        enqueue(
+            optimize_profile_photo, key=f'profile_photo.optimize:{profile.id}:{profile.profile_photo.name}',
+            profile_id=profile.id
+        )
+
+
+@task(name='recommendations.build', max_attempts=1)
+def update_recommendations():
+    run = build_recommendations()
+    return {'last_order_id': run.last_order_id, 'pairs_updated': run.pairs_updated} if run else None
+
+
+@task(name='archive.run', max_attempts=1)
+def run_archive():
+    return {'orders': archive_orders(), 'cart_items': archive_carts()}
+
+
+@task(name='inventory.compact', max_attempts=1)
+def run_stock_compaction():
+    return {'movements': compact_stock()}
@@ -1,3 +1,826 @@
-from django.test import TestCase
+import csv
+import os
+import re
+import shutil
+import tempfile
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
\ No newline at end of file
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .archive import archive_carts, archive_orders
+from .bulk import transition_orders
+from .facets import get_facets, parse_filters
+from .images import photo_for
+from .inventory import adjust_stock
+from .models import (
+    ArchivedCartItem, CartItem, Category, Order, OrderItem, OrderStatusHistory, Product, ProductPopularity,
+    ProductPair, RelatedProduct, StockMovement, Task, UserProfile, WorkerHeartbeat,
+)
+from .popularity import CounterBuffer, bucket_start, order_by_popularity
+from .read_model import ReadModel
+from .recommendations import build_recommendations, related_product_ids
+from .storage import HASHED_NAME_RE, hashed_digest
+from .taskqueue import (
+    VISIBILITY_TIMEOUT, claim, enqueue, execute, heartbeat, requeue_stale, task, work, workers_alive,
+)
+from .views import home_context, products_context
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def temporary_media_root(test):
+    media_root = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+    settings = override_settings(MEDIA_ROOT=media_root)
+    settings.enable()
+    test.addCleanup(settings.disable)
+    return media_root
+
+
+class LocalizeImagesTests(TestCase):
+    """localize_images against a local http.server standing in for the photo host"""
+
+    def setUp(self):
+        from PIL import Image
+
+        self.media_root = temporary_media_root(self)
+        photos = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, photos, ignore_errors=True)
+
+        category = Category.objects.create(name='Test')
+        self.polo, self.slim_polo, self.jeans, self.tee = [
+            Product.objects.create(name=name, description='-', category=category, price=10, stock=1)
+            for name in ['Classic Polo', 'Slim Polo', 'Denim Jeans', 'Plain Tee']
+        ]
+        # No file for the tee's photo, so the stand-in answers 404.
+        for product, size, color in [(self.polo, (1200, 900), 'navy'), (self.jeans, (800, 1600), 'teal')]:
+            Image.new('RGB', size, color).save(os.path.join(photos, photo_for(product.name)), 'JPEG')
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=photos))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.source = f'http://127.0.0.1:{server.server_port}'
+
+    def localize(self, *args):
+        out = StringIO()
+        with self.assertLogs('ecommerce_app.images', 'WARNING') as logs:
+            call_command('localize_images', '--source', self.source, '--retries', '0', *args, stdout=out)
+        self.assertIn(photo_for(self.tee.name), logs.output[0])
+        return out.getvalue()
+
+    def test_localizes_optimizes_and_rewrites_image_paths(self):
+        from PIL import Image
+
+        output = self.localize()
+        self.assertIn('Localized 3 product image(s), 0 already up to date, 1 failed.', output)
+
+        for product in (self.polo, self.slim_polo, self.jeans, self.tee):
+            product.refresh_from_db()
+        self.assertEqual(self.polo.image.name, self.slim_polo.image.name)
+        self.assertNotEqual(self.polo.image.name, self.jeans.image.name)
+        self.assertFalse(self.tee.image)
+        for product in (self.polo, self.jeans):
+            self.assertTrue(product.image.name.startswith('products/'))
+            self.assertRegex(product.image.name, HASHED_NAME_RE)
+            with default_storage.open(product.image.name) as f:
+                image = Image.open(f)
+                self.assertEqual(image.format, 'JPEG')
+                self.assertEqual(image.size, (600, 720))
+                self.assertTrue(image.info.get('progressive'))
+
+        # Products sharing a photo share one file.
+        stored = [files for _, _, files in os.walk(os.path.join(self.media_root, 'products'))]
+        self.assertEqual(sum(len(files) for files in stored), 2)
+
+    def test_rerun_is_idempotent(self):
+        self.localize()
+        names = dict(Product.objects.values_list('id', 'image'))
+
+        self.assertIn('Localized 0 product image(s), 0 already up to date, 1 failed.', self.localize())
+        self.assertIn('Localized 0 product image(s), 3 already up to date, 1 failed.', self.localize('--force'))
+        self.assertEqual(dict(Product.objects.values_list('id', 'image')), names)
+
+
+class MediaTests(TestCase):
+    """serve_media and ContentAddressedStorage"""
+
+    data = bytes(range(256)) * 4
+
+    def setUp(self):
+        self.media_root = temporary_media_root(self)
+        self.name = default_storage.save('products/photo.jpg', ContentFile(self.data))
+        self.url = '/media/' + self.name
+        self.etag = f'"{hashed_digest(self.name)}"'
+
+    def get(self, url=None, **headers):
+        response = self.client.get(url or self.url, **headers)
+        if response.streaming:
+            response.body = b''.join(response.streaming_content)
+            response.close()
+        return response
+
+    def test_full_response_is_cached_for_good(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.body, self.data)
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(response['Content-Length'], str(len(self.data)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.get(HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_range(self):
+        response = self.get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.data)}')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(response.body, self.data[10:20])
+
+        response = self.get(HTTP_RANGE='bytes=-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.body, self.data[-5:])
+
+        response = self.get(HTTP_RANGE='bytes=1000-')
+        self.assertEqual(response['Content-Range'], f'bytes 1000-1023/{len(self.data)}')
+        self.assertEqual(response.body, self.data[1000:])
+
+    def test_unsatisfiable_range(self):
+        for header in (f'bytes={len(self.data)}-', 'bytes=20-10', 'bytes=-0'):
+            response = self.get(HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 416, header)
+            self.assertEqual(response['Content-Range'], f'bytes */{len(self.data)}')
+
+    def test_if_range(self):
+        response = self.get(HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE=self.etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.body, self.data[:4])
+
+        # A stale validator gets the whole, current file.
+        response = self.get(HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.body, self.data)
+
+    def test_path_traversal_is_rejected(self):
+        for url in ('/media/../settings.py', '/media/products/../../../etc/passwd', '/media/%2e%2e/settings.py'):
+            self.assertEqual(self.get(url).status_code, 400, url)
+        self.assertEqual(self.get('/media/products/missing.jpg').status_code, 404)
+        self.assertEqual(self.get('/media/products/%00.jpg').status_code, 404)
+
+    def test_same_content_is_stored_once(self):
+        self.assertRegex(self.name, HASHED_NAME_RE)
+        self.assertEqual(default_storage.save('products/copy.jpg', ContentFile(self.data)), self.name)
+        other = default_storage.save('products/photo.jpg', ContentFile(self.data[::-1]))
+        self.assertNotEqual(other, self.name)
+
+        stored = [files for _, _, files in os.walk(os.path.join(self.media_root, 'products'))]
+        self.assertEqual(sum(len(files) for files in stored), 2)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class FacetCacheTests(TestCase):
+    """Cached facet counts follow catalog edits made by any process"""
+
+    def setUp(self):
+        # Version numbers restart with each test's rolled back database.
+        cache.clear()
+        category = Category.objects.create(name='Test')
+        self.product = Product.objects.create(name='Tee', description='-', category=category, price=30, stock=1)
+        self.filters = parse_filters({'in_stock': '1'})
+
+    def test_edits_invalidate_cached_facets(self):
+        self.assertEqual(get_facets(self.filters)['all_categories'], 1)
+        adjust_stock(self.product, -1)
+        self.assertEqual(get_facets(self.filters)['all_categories'], 0)
+
+    def test_edit_through_another_process_invalidates_cached_facets(self):
+        self.assertEqual(get_facets(self.filters)['all_categories'], 1)
+        # Another process has its own LocMemCache; only the database is shared.
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'other-process',
+        }}):
+            self.product.price = 120
+            self.product.save()
+        self.assertEqual(get_facets(self.filters)['price_buckets']['100-200'], 1)
+
+
+class RegistrationTests(TestCase):
+    def register(self, email):
+        return self.client.post('/register/', {
+            'full_name': 'Test User', 'email': email, 'address': '1 Test Street',
+            'contact_number': '0000000000', 'date_of_birth': '1990-01-01',
+            'password': 'Signup-test-9', 'confirm_password': 'Signup-test-9',
+        })
+
+    def test_email_case_does_not_create_a_second_account(self):
+        self.assertEqual(self.register('A@Example.com').status_code, 302)
+        response = self.register('a@example.com')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Email already exists.')
+        self.assertEqual(list(User.objects.values_list('username', 'email')), [('a@example.com', 'a@example.com')])
+
+    def test_login_with_registered_spelling(self):
+        self.register('A@Example.com')
+        response = self.client.post('/login/', {'username': 'A@Example.com', 'password': 'Signup-test-9'})
+        self.assertRedirects(response, '/dashboard/', fetch_redirect_response=False)
+
+
+class OrderTransitionTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('boss', 'boss@example.com', 'pw')
+        customer = User.objects.create_user('customer', 'customer@example.com', 'pw')
+        statuses = ['confirmed'] * 7 + ['pending', 'pending', 'shipped', 'cancelled']
+        self.orders = [Order.objects.create(user=customer, total_amount=10, status=status) for status in statuses]
+
+    def statuses(self):
+        return list(Order.objects.order_by('id').values_list('status', flat=True))
+
+    def test_moves_eligible_orders_in_batches(self):
+        with mock.patch('ecommerce_app.bulk.BATCH_SIZE', 3):
+            moved = transition_orders(Order.objects.all(), 'shipped', changed_by=self.admin)
+        self.assertEqual(moved, 7)
+        self.assertEqual(self.statuses(), ['shipped'] * 7 + ['pending', 'pending', 'shipped', 'cancelled'])
+
+        history = OrderStatusHistory.objects.order_by('order_id')
+        self.assertEqual(
+            list(history.values_list('order_id', 'from_status', 'to_status', 'changed_by')),
+            [(order.id, 'confirmed', 'shipped', self.admin.id) for order in self.orders[:7]]
+        )
+
+    def test_skips_orders_the_move_does_not_apply_to(self):
+        orders = Order.objects.filter(id__in=[order.id for order in self.orders[7:]])
+        self.assertEqual(transition_orders(orders, 'delivered'), 1)
+        self.assertEqual(transition_orders(orders, 'pending'), 0)
+        self.assertEqual(self.statuses()[7:], ['pending', 'pending', 'delivered', 'cancelled'])
+        self.assertEqual(OrderStatusHistory.objects.count(), 1)
+
+    def test_cancelling_needs_selected_orders(self):
+        self.client.force_login(self.admin)
+        self.client.post('/bulk-order-status/', {'status': 'cancelled', 'scope': 'all'})
+        self.assertNotIn('cancelled', self.statuses()[:10])
+
+        self.client.post('/bulk-order-status/', {
+            'status': 'cancelled', 'scope': 'selected', 'order_ids': [self.orders[7].id],
+        })
+        self.assertEqual(Order.objects.get(id=self.orders[7].id).status, 'cancelled')
+
+        self.client.post('/bulk-order-status/', {'status': 'delivered', 'scope': 'all'})
+        self.assertEqual(Order.objects.filter(status='delivered').count(), 1)
+
+
+class MemberStatusTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('boss', 'boss@example.com', 'pw'))
+        member = User.objects.create_user('member', 'member@example.com', 'pw')
+        self.profile = UserProfile.objects.create(
+            user=member, full_name='Member', address='-', contact_number='0', date_of_birth='1990-01-01'
+        )
+        self.url = f'/toggle-user-status/{self.profile.id}/'
+
+    def test_toggle_needs_post(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        self.profile.refresh_from_db()
+        self.assertTrue(self.profile.is_active)
+
+        self.assertRedirects(self.client.post(self.url), '/admin-dashboard/', fetch_redirect_response=False)
+        self.profile.refresh_from_db()
+        self.assertFalse(self.profile.is_active)
+
+    def test_dashboard_posts_the_toggle(self):
+        response = self.client.get('/admin-dashboard/')
+        self.assertContains(response, f'<form method="post" action="{self.url}"', html=False)
+
+
+class SessionFragmentTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Test')
+        self.product = Product.objects.create(name='Tee', description='-', category=category, price=30, stock=1)
+        self.hidden = Product.objects.create(
+            name='Old Tee', description='-', category=category, price=30, stock=1, is_active=False
+        )
+
+    @mock.patch('ecommerce_app.views.record_view')
+    def test_records_views_of_active_products_only(self, record_view):
+        for product_id in (self.product.id, self.hidden.id, 999999, 'x'):
+            response = self.client.get('/fragments/session/', {'product': product_id})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('csrf_token', response.json())
+        record_view.assert_called_once_with(self.product.id)
+
+
+class PopularityTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Test')
+        self.products = [
+            Product.objects.create(name=f'Tee {i}', description='-', category=category, price=30, stock=1)
+            for i in range(4)
+        ]
+        self.buffer = CounterBuffer(flush_interval=3600, max_buffered=100)
+
+    def counts(self):
+        return list(
+            ProductPopularity.objects.order_by('product_id').values_list('product_id', 'views', 'cart_adds')
+        )
+
+    def test_flush_aggregates_and_upserts(self):
+        first, second = self.products[:2]
+        for _ in range(3):
+            self.buffer.record(first.id, views=1)
+        self.buffer.record(first.id, cart_adds=2)
+        self.buffer.record(second.id, views=1)
+        self.assertEqual(self.counts(), [])
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(self.counts(), [(first.id, 3, 2), (second.id, 1, 0)])
+
+        self.buffer.record(first.id, views=1)
+        self.buffer.flush()
+        self.assertEqual(self.counts(), [(first.id, 4, 2), (second.id, 1, 0)])
+
+    def test_full_buffer_flushes(self):
+        buffer = CounterBuffer(flush_interval=3600, max_buffered=2)
+        buffer.record(self.products[0].id, views=1)
+        self.assertEqual(self.counts(), [])
+        buffer.record(self.products[1].id, views=1)
+        self.assertEqual(len(self.counts()), 2)
+
+    def test_flush_skips_deleted_products(self):
+        kept, deleted = self.products[:2]
+        self.buffer.record(kept.id, views=1)
+        self.buffer.record(deleted.id, views=1)
+        deleted.delete()
+        self.buffer.flush()
+        self.assertEqual(self.counts(), [(kept.id, 1, 0)])
+
+    def test_failed_write_does_not_raise(self):
+        self.buffer.record(self.products[0].id, views=1)
+        with mock.patch('ecommerce_app.popularity.write_counts', side_effect=DatabaseError('locked')):
+            with self.assertLogs('ecommerce_app.popularity', 'ERROR'):
+                self.assertEqual(self.buffer.flush(), 0)
+
+    def test_flush_prunes_old_buckets(self):
+        now = timezone.now()
+        product = self.products[0]
+        ProductPopularity.objects.create(product=product, bucket=bucket_start(now - timedelta(days=40)), views=9)
+        self.buffer.record(product.id, views=1)
+        self.buffer.flush()
+        self.assertEqual(self.counts(), [(product.id, 1, 0)])
+
+    def test_order_by_popularity(self):
+        old, viewed, added, idle = self.products
+        now = timezone.now()
+        ProductPopularity.objects.bulk_create([
+            ProductPopularity(product=old, bucket=bucket_start(now - timedelta(days=20)), views=10),
+            ProductPopularity(product=viewed, bucket=bucket_start(now), views=5),
+            ProductPopularity(product=added, bucket=bucket_start(now), cart_adds=2),
+            # Outside the 30 day window
+            ProductPopularity(product=idle, bucket=bucket_start(now - timedelta(days=35)), views=1000),
+        ])
+        products = Product.objects.all()
+        # A cart add weighs 5 views; 10 views 20 days ago decay below 5 fresh ones.
+        self.assertEqual(list(order_by_popularity(products)), [added, viewed, old, idle])
+        # Only the last 48 hours count; ties fall back to the newest product.
+        self.assertEqual(list(order_by_popularity(products, 'trending')), [added, viewed, idle, old])
+
+
+class PriceFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Test')
+        self.cheap, self.hundred, self.dear = [
+            Product.objects.create(name=f'Tee {price}', description='-', category=category, price=price, stock=1)
+            for price in (40, 100, 150)
+        ]
+
+    def ids(self, query, read_model=False):
+        with override_settings(CATALOG_READ_MODEL=read_model), \
+                mock.patch('ecommerce_app.read_model.read_model', ReadModel()):
+            context = products_context(QueryDict(query))
+        return {product.id for product in context['products']}, context['all_categories_count']
+
+    def test_typed_maximum_includes_that_price(self):
+        for read_model in (False, True):
+            self.assertEqual(
+                self.ids('max_price=100', read_model), ({self.cheap.id, self.hundred.id}, 2)
+            )
+            self.assertEqual(self.ids('min_price=100&max_price=100', read_model), ({self.hundred.id}, 1))
+
+    def test_price_buckets_do_not_overlap(self):
+        for read_model in (False, True):
+            self.assertEqual(self.ids('price=50-100', read_model), (set(), 0))
+            self.assertEqual(self.ids('price=100-200', read_model), ({self.hundred.id, self.dear.id}, 2))
+
+
+class CartArchiveTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Test')
+        self.tee, self.polo = [
+            Product.objects.create(name=name, description='-', category=category, price=30, stock=5)
+            for name in ('Tee', 'Polo')
+        ]
+
+    def add(self, session_key, product, days_ago):
+        return CartItem.objects.create(
+            session_key=session_key, product=product, created_at=timezone.now() - timedelta(days=days_ago)
+        )
+
+    def test_archives_whole_carts_that_went_stale(self):
+        self.add('abandoned', self.tee, 45)
+        self.add('abandoned', self.polo, 31)
+        self.add('in-use', self.tee, 31)
+        kept = self.add('in-use', self.polo, 2)
+
+        self.assertEqual(archive_carts(cutoff=timezone.now() - timedelta(days=30), batch_size=1), 2)
+        self.assertEqual(
+            sorted(ArchivedCartItem.objects.values_list('session_key', 'product_id')),
+            [('abandoned', self.tee.id), ('abandoned', self.polo.id)]
+        )
+        self.assertEqual(CartItem.objects.filter(session_key='in-use').count(), 2)
+        self.assertTrue(CartItem.objects.filter(id=kept.id).exists())
+
+
+class StockAdjustmentTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Test')
+        self.product = Product.objects.create(name='Tee', description='-', category=category, price=30, stock=3)
+
+    def stock(self):
+        return Product.objects.values_list('stock', flat=True).get(id=self.product.id)
+
+    def test_cannot_remove_more_than_in_stock(self):
+        with self.assertRaises(ValidationError):
+            adjust_stock(self.product, -100)
+        self.assertEqual(self.stock(), 3)
+        self.assertFalse(StockMovement.objects.exists())
+
+        adjust_stock(self.product, -3)
+        adjust_stock(self.product, 5, reason='restock')
+        self.assertEqual(self.stock(), 5)
+        self.assertEqual(list(StockMovement.objects.order_by('id').values_list('quantity', flat=True)), [-3, 5])
+
+    def test_admin_inline_reports_oversized_removal(self):
+        self.client.force_login(User.objects.create_superuser('boss', 'boss@example.com', 'pw'))
+        data = {
+            'name': 'Tee', 'description': '-', 'category': self.product.category_id, 'price': '30',
+            'is_active': 'on', 'created_at_0': '2026-01-01', 'created_at_1': '00:00:00',
+            'stock_movements-TOTAL_FORMS': '1', 'stock_movements-INITIAL_FORMS': '0',
+            'stock_movements-MIN_NUM_FORMS': '0', 'stock_movements-MAX_NUM_FORMS': '1000',
+            'stock_movements-0-quantity': '-10', 'stock_movements-0-reason': 'adjustment',
+        }
+        url = f'/admin/ecommerce_app/product/{self.product.id}/change/'
+        response = self.client.post(url, data)
+        self.assertContains(response, 'Cannot remove 10 unit(s); only 3 in stock.')
+        self.assertEqual(self.stock(), 3)
+
+        data['stock_movements-0-quantity'] = '-2'
+        self.assertEqual(self.client.post(url, data).status_code, 302)
+        self.assertEqual(self.stock(), 1)
+
+
+@task(name='tests.add')
+def add(a, b):
+    return a + b
+
+
+@task(name='tests.broken', max_attempts=2)
+def broken():
+    raise RuntimeError('always fails')
+
+
+@task(name='tests.unserializable', max_attempts=1)
+def unserializable():
+    return object()
+
+
+class TaskQueueTests(TestCase):
+    def run_next(self):
+        (task_row,) = claim('test-worker')
+        return execute(task_row)
+
+    def test_enqueue_with_key_is_idempotent(self):
+        first = enqueue(add, key='add-1-2', a=1, b=2)
+        self.assertEqual(enqueue(add, key='add-1-2', a=1, b=2).id, first.id)
+        self.assertNotEqual(enqueue(add, a=1, b=2).id, first.id)
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_only_one_worker_claims_a_task(self):
+        enqueue(add, a=1, b=2)
+        self.assertEqual(len(claim('worker-a')), 1)
+        self.assertEqual(claim('worker-b'), [])
+
+    @mock.patch('ecommerce_app.taskqueue.close_old_connections')
+    def test_work_runs_queued_tasks(self, close_old_connections):
+        task_row = enqueue(add, a=1, b=2)
+        self.assertFalse(workers_alive())
+        self.assertEqual(work(threading.Event(), once=True), 1)
+        task_row.refresh_from_db()
+        self.assertEqual((task_row.status, task_row.result, task_row.attempts), ('done', 3, 1))
+        self.assertTrue(workers_alive())
+
+    def test_retries_with_backoff_then_fails(self):
+        task_row = enqueue(broken)
+        self.assertFalse(self.run_next())
+        task_row.refresh_from_db()
+        self.assertEqual((task_row.status, task_row.attempts), ('queued', 1))
+        self.assertGreater(task_row.run_after, timezone.now())
+        self.assertIn('always fails', task_row.last_error)
+        self.assertEqual(claim('test-worker'), [])
+
+        Task.objects.filter(id=task_row.id).update(run_after=timezone.now())
+        self.assertFalse(self.run_next())
+        task_row.refresh_from_db()
+        self.assertEqual((task_row.status, task_row.attempts), ('failed', 2))
+        self.assertIsNotNone(task_row.finished_at)
+
+    def test_unserializable_result_fails_the_task(self):
+        task_row = enqueue(unserializable)
+        self.assertFalse(self.run_next())
+        task_row.refresh_from_db()
+        self.assertEqual(task_row.status, 'failed')
+        self.assertIn('TypeError', task_row.last_error)
+
+    def test_stale_running_task_is_requeued(self):
+        task_row = enqueue(add, a=2, b=2)
+        claim('dead-worker')
+        self.assertEqual(requeue_stale(), 0)
+
+        Task.objects.filter(id=task_row.id).update(started_at=timezone.now() - VISIBILITY_TIMEOUT * 2)
+        self.assertEqual(requeue_stale(), 1)
+        self.assertTrue(self.run_next())
+        task_row.refresh_from_db()
+        self.assertEqual((task_row.status, task_row.result, task_row.attempts), ('done', 4, 2))
+
+    def test_workers_alive_follows_heartbeats(self):
+        heartbeat('worker-a')
+        self.assertTrue(workers_alive())
+        WorkerHeartbeat.objects.update(seen_at=timezone.now() - timedelta(minutes=5))
+        self.assertFalse(workers_alive())
+
+
+@override_settings(CATALOG_READ_MODEL=True)
+class ReadModelHomeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('ecommerce_app.read_model.read_model', ReadModel())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        category = Category.objects.create(name='Test')
+        self.products = [
+            Product.objects.create(name=f'Tee {i}', description='-', category=category, price=30, stock=1)
+            for i in range(3)
+        ]
+
+    def test_home_is_served_from_memory(self):
+        first = [product.id for product in home_context()['products']]
+        with self.assertNumQueries(0):
+            again = [product.id for product in home_context()['products']]
+        self.assertEqual(again, first)
+        self.assertEqual(sorted(first), [product.id for product in self.products])
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user('customer', 'customer@example.com', 'pw')
+        category = Category.objects.create(name='Test')
+        self.a, self.b, self.c, self.d, self.e = [
+            Product.objects.create(name=name, description='-', category=category, price=10, stock=10)
+            for name in 'abcde'
+        ]
+
+    def order(self, *products, status='delivered'):
+        order = Order.objects.create(user=self.customer, total_amount=10, status=status)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=1, price=10) for product in products
+        ])
+
+    def stored(self):
+        return (
+            sorted(ProductPair.objects.values_list('product_id', 'other_id', 'count')),
+            sorted(RelatedProduct.objects.values_list('product_id', 'related_id', 'score', 'rank')),
+        )
+
+    def test_incremental_runs_match_a_full_rebuild(self):
+        a, b, c, d, e = self.a, self.b, self.c, self.d, self.e
+        self.order(a, b, c)
+        self.order(a, b)
+        self.order(a, d)
+        build_recommendations(k=2)
+
+        self.order(a, c)
+        self.order(a, c)
+        self.order(b, c, e)
+        self.order(a, e, status='cancelled')
+        build_recommendations(k=2)
+
+        self.order(a, c, d)
+        run = build_recommendations(k=2)
+        self.assertIsNone(build_recommendations(k=2))
+
+        incremental = self.stored()
+        full = build_recommendations(full=True, k=2)
+        self.assertEqual(self.stored(), incremental)
+        self.assertEqual(full.last_order_id, run.last_order_id)
+
+        pairs = {(product, other): count for product, other, count in incremental[0]}
+        self.assertEqual(pairs[(a.id, c.id)], 4)
+        self.assertNotIn((a.id, e.id), pairs)
+        # c leads with 4; b and d tie on 2 and the lower id wins.
+        self.assertEqual(related_product_ids(a.id), [c.id, b.id])
+        self.assertEqual(
+            list(RelatedProduct.objects.filter(product=a).order_by('rank').values_list('score', 'rank')),
+            [(4, 1), (2, 2)]
+        )
+
+
+class SalesAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('boss', 'boss@example.com', 'pw'))
+        customer = User.objects.create_user('customer', 'customer@example.com', 'pw')
+        tops = Category.objects.create(name='Tops')
+        tee, polo = [
+            Product.objects.create(name=name, description='-', category=tops, price=10, stock=10)
+            for name in ('Tee', 'Polo')
+        ]
+        for day, status, items in [
+            (3, 'confirmed', [(tee, 1, 10), (polo, 1, 20)]),
+            (11, 'delivered', [(tee, 2, 10)]),
+            (12, 'cancelled', [(polo, 5, 20)]),
+        ]:
+            order = Order.objects.create(
+                user=customer, status=status, total_amount=sum(quantity * price for _, quantity, price in items),
+                created_at=timezone.make_aware(datetime(2026, 3, day, 12))
+            )
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=quantity, price=price)
+                for product, quantity, price in items
+            ])
+        # The delivered and cancelled orders move to the archive tables.
+        archive_orders(cutoff=timezone.now())
+        self.query = {'start': '2026-03-01', 'end': '2026-03-14'}
+
+    def test_report_totals(self):
+        report = self.client.get('/admin-dashboard/analytics/', self.query).context['report']
+        self.assertEqual(
+            (report['revenue'], report['orders'], report['average_order_value']),
+            (Decimal('50.00'), 2, Decimal('25.00'))
+        )
+        self.assertEqual(
+            [(week['week'], week['revenue'], week['orders']) for week in report['weeks']],
+            [(date(2026, 2, 23), 0, 0), (date(2026, 3, 2), 30, 1), (date(2026, 3, 9), 20, 1)]
+        )
+        self.assertAlmostEqual(float(report['weeks'][2]['change']), -33.33, places=2)
+        self.assertEqual(
+            [(product['name'], product['units'], product['revenue']) for product in report['top_products']],
+            [('Tee', 3, Decimal('30.00')), ('Polo', 1, Decimal('20.00'))]
+        )
+        self.assertEqual(
+            [(category['name'], category['share']) for category in report['categories']], [('Tops', 100)]
+        )
+
+    def test_csv_export(self):
+        response = self.client.get('/admin-dashboard/analytics/', {**self.query, 'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('sales-2026-03-01-2026-03-14.csv', response['Content-Disposition'])
+        rows = list(csv.reader(response.content.decode().splitlines()))
+        self.assertEqual(rows[1], ['2026-03-01 to 2026-03-14', '50.00', '2', '25.00'])
+        self.assertEqual(rows[4:7], [['2026-02-23', '0.00', '0', ''], ['2026-03-02', '30.00', '1', ''],
+                                     ['2026-03-09', '20.00', '1', '-33.3']])
+        self.assertIn(['Tee', '3', '30.00'], rows)
+        self.assertIn(['Tops', '4', '50.00', '100.0'], rows)
+
+
+class OrderDetailTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.other = User.objects.create_user('other', 'other@example.com', 'pw')
+        self.boss = User.objects.create_superuser('boss', 'boss@example.com', 'pw')
+        category = Category.objects.create(name='Tops')
+        tee = Product.objects.create(name='Tee', description='-', category=category, price=10, stock=10)
+        self.live, self.archived = [
+            Order.objects.create(user=self.owner, total_amount=10, status=status) for status in ('pending', 'delivered')
+        ]
+        for order in (self.live, self.archived):
+            OrderItem.objects.create(order=order, product=tee, quantity=1, price=10)
+        transition_orders(Order.objects.filter(id=self.live.id), 'confirmed', changed_by=self.boss)
+        archive_orders(cutoff=timezone.now())
+
+    def get(self, user, order):
+        self.client.force_login(user)
+        return self.client.get(f'/orders/{order.id}/')
+
+    def test_owner_and_superuser_see_live_and_archived_orders(self):
+        for user in (self.owner, self.boss):
+            response = self.get(user, self.live)
+            self.assertContains(response, 'Tee')
+            self.assertFalse(response.context['archived'])
+            self.assertEqual(
+                [(change['from_status'], change['to_status']) for change in response.context['history']],
+                [('Pending', 'Confirmed')]
+            )
+            response = self.get(user, self.archived)
+            self.assertContains(response, 'Tee')
+            self.assertTrue(response.context['archived'])
+
+    def test_other_members_get_404(self):
+        for order in (self.live, self.archived):
+            self.assertEqual(self.get(self.other, order).status_code, 404)
+        self.client.logout()
+        self.assertRedirects(
+            self.client.get(f'/orders/{self.live.id}/'), f'/login/?next=/orders/{self.live.id}/',
+            fetch_redirect_response=False
+        )
+
+
+class StreamingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Tops')
+        for i in range(5):
+            product = Product.objects.create(name=f'Tee {i}', description='-', category=category, price=10, stock=1)
+            member = User.objects.create_user(f'member{i}', f'member{i}@example.com', 'pw')
+            UserProfile.objects.create(
+                user=member, full_name=f'Member {i}', address='-', contact_number='0', date_of_birth='1990-01-01'
+            )
+        self.boss = User.objects.create_superuser('boss', 'boss@example.com', 'pw')
+
+    def render(self, url, streaming):
+        min_rows = 1 if streaming else None
+        with override_settings(STREAMING_HTML_MIN_ROWS=min_rows, STREAMING_HTML_CHUNK_SIZE=2):
+            response = self.client.get(url)
+        self.assertEqual(response.streaming, streaming)
+        content = b''.join(response.streaming_content) if streaming else response.content
+        # CSRF tokens are masked differently on every render, and each chunk
+        # of rows ends with the fragment's trailing newline.
+        content = re.sub(r'name="csrfmiddlewaretoken" value="[^"]+"', 'csrf', content.decode())
+        return re.sub(r'>\s+<', '><', content)
+
+    def test_streamed_pages_match_buffered_pages(self):
+        self.assertEqual(self.render('/products/', True), self.render('/products/', False))
+        self.assertIn('Tee 4', self.render('/products/', True))
+
+        self.client.force_login(self.boss)
+        self.assertEqual(self.render('/admin-dashboard/', True), self.render('/admin-dashboard/', False))
+        self.assertIn('Member 4', self.render('/admin-dashboard/', True))
+
+
+class OrderArchiveTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        category = Category.objects.create(name='Tops')
+        self.vintage, self.fresh = [
+            Product.objects.create(name=name, description='-', category=category, price=10, stock=10)
+            for name in ('Vintage Tee', 'Fresh Polo')
+        ]
+        self.old = Order.objects.create(
+            user=self.owner, total_amount=20, status='delivered', created_at=timezone.now() - timedelta(days=400)
+        )
+        OrderItem.objects.create(order=self.old, product=self.vintage, quantity=2, price=10)
+        self.new = Order.objects.create(user=self.owner, total_amount=10, status='pending')
+        OrderItem.objects.create(order=self.new, product=self.fresh, quantity=1, price=10)
+        self.client.force_login(self.owner)
+
+    def order_ids(self, response):
+        return [order.id for order in response.context['orders']]
+
+    def test_archived_orders_stay_on_the_dashboard(self):
+        response = self.client.get('/dashboard/')
+        self.assertEqual(self.order_ids(response), [self.new.id, self.old.id])
+        self.assertFalse(response.context['has_archived_orders'])
+
+        self.assertEqual(archive_orders(), 1)
+        # The archive keeps the product name after the product is gone.
+        self.vintage.delete()
+
+        response = self.client.get('/dashboard/')
+        self.assertEqual(self.order_ids(response), [self.new.id])
+        self.assertTrue(response.context['has_archived_orders'])
+        self.assertNotContains(response, 'Vintage Tee')
+
+        response = self.client.get('/dashboard/', {'archived': '1'})
+        self.assertEqual(self.order_ids(response), [self.old.id])
+        self.assertContains(response, 'Vintage Tee &times; 2', html=False)
+        self.assertContains(response, f'/orders/{self.old.id}/')
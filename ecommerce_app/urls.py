@@ -7,12 +7,18 @@ urlpatterns = [
     path('register/', views.user_register, name='register'),
     path('logout/', views.user_logout, name='logout'),
     path('dashboard/', views.user_dashboard, name='user_dashboard'),
+    path('orders/<int:order_id>/', views.order_detail, name='order_detail'),
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
+    path('admin-dashboard/analytics/', views.sales_analytics, name='sales_analytics'),
     path('toggle-user-status/<int:user_id>/', views.toggle_user_status, name='toggle_user_status'),
+    path('bulk-user-status/', views.bulk_user_status, name='bulk_user_status'),
+    path('bulk-order-status/', views.bulk_order_status, name='bulk_order_status'),
     path('edit-profile/', views.edit_profile, name='edit_profile'),
     path('products/', views.products, name='products'),
     path('product/<int:product_id>/', views.product_detail, name='product_detail'),
     path('add-to-cart/<int:product_id>/', views.add_to_cart, name='add_to_cart'),
     path('cart/', views.view_cart, name='view_cart'),
     path('remove-from-cart/<int:item_id>/', views.remove_from_cart, name='remove_from_cart'),
+    path('healthz/', views.readiness, name='readiness'),
+    path('fragments/session/', views.session_fragment, name='session_fragment'),
 ]
\ No newline at end of file
@@ -1,20 +1,61 @@
+import copy
+import csv
+from datetime import timedelta
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Sum, Count
-from .models import UserProfile, Product, Category, Order, OrderItem, CartItem
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import Case, Count, Value, When
+from .models import UserProfile, Product, Category, Order, OrderItem, ArchivedOrder, CartItem
 from .forms import UserRegistrationForm, UserProfileForm
-from django.http import JsonResponse
+from .analytics import sales_report
+from .bulk import FORWARD_STATUSES, ORDER_TRANSITIONS, set_users_active, source_statuses, transition_orders
+from .facets import PRICE_BUCKETS, filter_products, get_facets, parse_filters
+from .inventory import low_stock
+from .popularity import SCORES, order_by_popularity, record_cart_add, record_view
+from .recommendations import related_product_ids, related_products
+from .streaming import should_stream, stream_template
+from .tasks import dashboard_metrics, enqueue_profile_photo
+from . import read_model
+from .warmup import state as warmup_state, warm_up
+from django.http import Http404, HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
+
+ORDERS_PER_PAGE = 10
+# Popularity drifts slowly; the featured ids are recomputed this often.
+FEATURED_CACHE_TIMEOUT = 60
+
+def home_context():
+    featured = order_by_popularity(Product.objects.filter(is_active=True))[:8]
+    if read_model.enabled():
+        snapshot = read_model.current_snapshot()
+        # Keyed by version so an edited catalog picks new ids right away.
+        featured_ids = cache.get_or_set(
+            f'home_featured:{snapshot.version}',
+            lambda: list(featured.values_list('id', flat=True)),
+            FEATURED_CACHE_TIMEOUT
+        )
+        return {
+            'products': snapshot.many(featured_ids),
+            'categories': snapshot.categories
+        }
+    return {
+        'products': featured,
+        'categories': Category.objects.all()
+    }
 
 def home(request):
-    products = Product.objects.filter(is_active=True)[:8]
-    categories = Category.objects.all()
-    return render(request, 'home.html', {
-        'products': products,
-        'categories': categories
-    })
+    return render(request, 'home.html', home_context())
 
 def user_login(request):
     if request.method == 'POST':
@@ -27,6 +68,9 @@ def user_login(request):
                 User.objects.create_superuser('admin', 'admin@risearc.com', 'admin')
         
         user = authenticate(request, username=username, password=password)
+        if user is None and username != username.lower():
+            # Emails are registered lowercased; older accounts keep their case.
+            user = authenticate(request, username=username.lower(), password=password)
         
         if user is not None:
             try:
@@ -51,32 +95,29 @@ def user_register(request):
         form = UserRegistrationForm(request.POST, request.FILES)
         if form.is_valid():
             email = form.cleaned_data['email']
+            # Hash before the transaction so it stays short.
+            user = User(username=User.normalize_username(email), email=User.objects.normalize_email(email))
+            user.set_password(form.cleaned_data['password'])
             
-            # Check if user already exists
-            if User.objects.filter(username=email).exists():
-                messages.error(request, 'User with this email already exists.')
-                return render(request, 'register.html', {'form': form})
-            
+            # The unique username (the email) rejects duplicates, so there
+            # is no separate "already exists" query.
             try:
-                user = User.objects.create_user(
-                    username=email,
-                    email=email,
-                    password=form.cleaned_data['password']
-                )
-                
-                UserProfile.objects.create(
-                    user=user,
-                    full_name=form.cleaned_data['full_name'],
-                    address=form.cleaned_data['address'],
-                    contact_number=form.cleaned_data['contact_number'],
-                    date_of_birth=form.cleaned_data['date_of_birth'],
-                    profile_photo=form.cleaned_data.get('profile_photo')
-                )
-                
+                with transaction.atomic():
+                    user.save()
+                    profile = UserProfile.objects.create(
+                        user=user,
+                        full_name=form.cleaned_data['full_name'],
+                        address=form.cleaned_data['address'],
+                        contact_number=form.cleaned_data['contact_number'],
+                        date_of_birth=form.cleaned_data['date_of_birth'],
+                        profile_photo=form.cleaned_data.get('profile_photo')
+                    )
+            except IntegrityError:
+                form.add_error('email', 'Email already exists.')
+            else:
+                enqueue_profile_photo(profile)
                 messages.success(request, 'Registration successful! Please login.')
                 return redirect('login')
-            except Exception as e:
-                messages.error(request, 'Registration failed. Please try again.')
     else:
         form = UserRegistrationForm()
     
@@ -84,16 +125,52 @@ def user_register(request):
 
 @login_required
 def user_dashboard(request):
-    try:
-        profile = UserProfile.objects.get(user=request.user)
-    except UserProfile.DoesNotExist:
-        profile = None
-    
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
+    # Served by the (user, created_at) index; only one page of orders and
+    # their line items is ever loaded.
+    archived = request.GET.get('archived') == '1'
+    if archived:
+        orders = ArchivedOrder.objects.filter(user=request.user).order_by('-created_at', '-id')
+    else:
+        orders = Order.objects.filter(user=request.user).order_by('-created_at', '-id')
+    page = Paginator(orders, ORDERS_PER_PAGE).get_page(request.GET.get('page'))
+    page.object_list = page.object_list.prefetch_related('items' if archived else 'items__product')
     
     return render(request, 'user_dashboard.html', {
-        'profile': profile,
-        'orders': orders
+        'profile': request.profile if request.profile.pk else None,
+        'orders': page,
+        'archived': archived,
+        'has_archived_orders': archived or ArchivedOrder.objects.filter(user=request.user).exists()
+    })
+
+@login_required
+def order_detail(request, order_id):
+    orders = Order.objects.select_related('user').prefetch_related('items__product')
+    archived_orders = ArchivedOrder.objects.select_related('user').prefetch_related('items')
+    if not request.user.is_superuser:
+        orders = orders.filter(user=request.user)
+        archived_orders = archived_orders.filter(user=request.user)
+    
+    order = orders.filter(id=order_id).first()
+    if order is not None:
+        history = [
+            {'created_at': change.created_at, 'from_status': change.get_from_status_display(),
+             'to_status': change.get_to_status_display()}
+            for change in order.status_history.order_by('created_at')
+        ]
+    else:
+        order = get_object_or_404(archived_orders, id=order_id)
+        labels = dict(Order.STATUS_CHOICES)
+        history = [
+            {'created_at': parse_datetime(change['created_at']),
+             'from_status': labels.get(change['from_status'], change['from_status']),
+             'to_status': labels.get(change['to_status'], change['to_status'])}
+            for change in order.status_history
+        ]
+    
+    return render(request, 'order_detail.html', {
+        'order': order,
+        'history': history,
+        'archived': isinstance(order, ArchivedOrder)
     })
 
 @login_required
@@ -101,48 +178,137 @@ def admin_dashboard(request):
     if not request.user.is_superuser:
         return redirect('user_dashboard')
     
-    total_users = UserProfile.objects.count()
-    active_users = UserProfile.objects.filter(is_active=True).count()
-    total_products = Product.objects.count()
-    total_orders = Order.objects.count()
-    total_revenue = Order.objects.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-    
-    recent_orders = Order.objects.order_by('-created_at')[:10]
-    users = UserProfile.objects.all().order_by('-created_at')
-    
-    return render(request, 'admin_dashboard.html', {
-        'total_users': total_users,
-        'active_users': active_users,
-        'total_products': total_products,
-        'total_orders': total_orders,
-        'total_revenue': total_revenue,
+    metrics = dashboard_metrics()
+    
+    recent_orders = Order.objects.select_related('user').order_by('-created_at')[:10]
+    low_stock_products = low_stock().select_related('category')[:10]
+    users = UserProfile.objects.select_related('user').order_by('-created_at')
+    
+    context = {
+        **metrics,
         'recent_orders': recent_orders,
+        'low_stock_products': low_stock_products,
+        'order_statuses': [(status, label) for status, label in Order.STATUS_CHOICES if status != 'pending'],
         'users': users
+    }
+    if should_stream(users.count()):
+        return stream_template(request, 'admin_dashboard.html', context, 'fragments/user_rows.html', 'users')
+    return render(request, 'admin_dashboard.html', context)
+
+def _parse_report_date(value):
+    # parse_date raises ValueError for well-formed but impossible dates.
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+def _report_dates(params):
+    end = _parse_report_date(params.get('end')) or timezone.localdate()
+    start = _parse_report_date(params.get('start')) or end - timedelta(days=364)
+    return (start, end) if start <= end else (end, start)
+
+@login_required
+def sales_analytics(request):
+    if not request.user.is_superuser:
+        return redirect('user_dashboard')
+    
+    start, end = _report_dates(request.GET)
+    report = sales_report(start, end)
+    
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="sales-{start}-{end}.csv"'
+        writer = csv.writer(response)
+        writer.writerow(['Summary', 'Revenue', 'Orders', 'Average order value'])
+        writer.writerow([f'{start} to {end}', report['revenue'], report['orders'], report['average_order_value']])
+        writer.writerow([])
+        writer.writerow(['Week', 'Revenue', 'Orders', 'Change %'])
+        for week in report['weeks']:
+            change = '' if week['change'] is None else round(week['change'], 1)
+            writer.writerow([week['week'], week['revenue'], week['orders'], change])
+        writer.writerow([])
+        writer.writerow(['Top product', 'Units', 'Revenue'])
+        for product in report['top_products']:
+            writer.writerow([product['name'], product['units'], product['revenue']])
+        writer.writerow([])
+        writer.writerow(['Category', 'Units', 'Revenue', 'Share %'])
+        for category in report['categories']:
+            share = '' if category['share'] is None else round(category['share'], 1)
+            writer.writerow([category['name'], category['units'], category['revenue'], share])
+        return response
+    
+    return render(request, 'sales_analytics.html', {
+        'report': report,
+        'export_query': _filter_query(request.GET, format='csv', start=start.isoformat(), end=end.isoformat())
     })
 
 @login_required
+@require_POST
 def toggle_user_status(request, user_id):
     if not request.user.is_superuser:
         return redirect('user_dashboard')
     
-    profile = get_object_or_404(UserProfile, id=user_id)
-    profile.is_active = not profile.is_active
-    profile.save()
+    updated = UserProfile.objects.filter(id=user_id).update(
+        is_active=Case(When(is_active=True, then=Value(False)), default=Value(True))
+    )
+    if not updated:
+        raise Http404('No UserProfile matches the given query.')
     
     messages.success(request, f'User status updated successfully.')
     return redirect('admin_dashboard')
 
+def _selected_ids(request, field):
+    return [value for value in request.POST.getlist(field) if value.isdigit()]
+
+@login_required
+@require_POST
+def bulk_user_status(request):
+    if not request.user.is_superuser:
+        return redirect('user_dashboard')
+    
+    action = request.POST.get('action')
+    if action not in ('activate', 'deactivate'):
+        messages.error(request, 'Unknown member action.')
+        return redirect('admin_dashboard')
+    
+    profiles = UserProfile.objects.filter(id__in=_selected_ids(request, 'user_ids'))
+    updated = set_users_active(profiles, action == 'activate')
+    messages.success(request, f'{updated} member(s) {action}d.')
+    return redirect('admin_dashboard')
+
+@login_required
+@require_POST
+def bulk_order_status(request):
+    if not request.user.is_superuser:
+        return redirect('user_dashboard')
+    
+    status = request.POST.get('status')
+    if status not in ORDER_TRANSITIONS:
+        messages.error(request, 'Unknown order status.')
+        return redirect('admin_dashboard')
+    
+    if request.POST.get('scope') == 'all':
+        if status not in FORWARD_STATUSES:
+            messages.error(request, f'Select the orders to mark as {status}.')
+            return redirect('admin_dashboard')
+        orders = Order.objects.filter(status__in=source_statuses(status))
+    else:
+        orders = Order.objects.filter(id__in=_selected_ids(request, 'order_ids'))
+    moved = transition_orders(orders, status, changed_by=request.user)
+    messages.success(request, f'{moved} order(s) marked as {status}.')
+    return redirect('admin_dashboard')
+
 @login_required
 def edit_profile(request):
-    try:
-        profile = UserProfile.objects.get(user=request.user)
-    except UserProfile.DoesNotExist:
-        profile = None
+    # An unsaved profile (user set) for members who never completed one
+    profile = request.profile
     
     if request.method == 'POST':
         form = UserProfileForm(request.POST, request.FILES, instance=profile)
         if form.is_valid():
-            form.save()
+            profile = form.save()
+            if 'profile_photo' in form.changed_data:
+                enqueue_profile_photo(profile)
             messages.success(request, 'Profile updated successfully!')
             return redirect('user_dashboard')
     else:
@@ -150,24 +316,123 @@ def edit_profile(request):
     
     return render(request, 'edit_profile.html', {'form': form})
 
-def products(request):
-    category_id = request.GET.get('category')
-    if category_id:
-        products = Product.objects.filter(category_id=category_id, is_active=True)
+def _filter_query(params, **changes):
+    query = params.copy()
+    for key, value in changes.items():
+        query.pop(key, None)
+        if value not in (None, ''):
+            query[key] = value
+    return query.urlencode()
+
+def products_context(params):
+    filters = parse_filters(params)
+    facets = get_facets(filters)
+
+    sort = params.get('sort')
+    if sort not in SCORES:
+        sort = None
+
+    if read_model.enabled() and not sort:
+        snapshot = read_model.current_snapshot()
+        products = snapshot.filter(filters)
+        categories = snapshot.categories
     else:
-        products = Product.objects.filter(is_active=True)
-    
-    categories = Category.objects.all()
+        products = filter_products(
+            Product.objects.filter(is_active=True).select_related('category'),
+            filters
+        )
+        if sort:
+            products = order_by_popularity(products, sort)
+        categories = Category.objects.all()
+
+    categories = [
+        {
+            'id': category.id,
+            'name': category.name,
+            'product_count': facets['categories'].get(category.id, 0),
+            'filter_query': _filter_query(params, category=category.id),
+        }
+        for category in categories
+    ]
+
+    price_buckets = [
+        {
+            'key': key,
+            'label': label,
+            'count': facets['price_buckets'][key],
+            'filter_query': _filter_query(params, price=key, min_price=None, max_price=None),
+        }
+        for key, label, low, high in PRICE_BUCKETS
+    ]
     
-    return render(request, 'products.html', {
+    return {
         'products': products,
+        'product_count': len(products) if isinstance(products, list) else products.count(),
         'categories': categories,
-        'selected_category': int(category_id) if category_id else None
-    })
+        'price_buckets': price_buckets,
+        'all_categories_count': facets['all_categories'],
+        'all_categories_query': _filter_query(params, category=None),
+        'all_prices_query': _filter_query(params, price=None, min_price=None, max_price=None),
+        'filters': filters,
+        'sort': sort,
+        'sort_queries': {
+            'featured': _filter_query(params, sort=None),
+            'popular': _filter_query(params, sort='popular'),
+            'trending': _filter_query(params, sort='trending'),
+        },
+        'selected_category': filters['category']
+    }
+
+def products(request):
+    context = products_context(request.GET)
+    if should_stream(context['product_count']):
+        return stream_template(request, 'products.html', context, 'fragments/product_cards.html', 'products')
+    return render(request, 'products.html', context)
+
+def product_detail_context(product):
+    if read_model.enabled():
+        snapshot = read_model.current_snapshot()
+        return {
+            'product': product,
+            'related_products': snapshot.many(related_product_ids(product.id))[:4]
+        }
+    return {
+        'product': product,
+        'related_products': related_products(product)
+    }
 
 def product_detail(request, product_id):
-    product = get_object_or_404(Product, id=product_id, is_active=True)
-    return render(request, 'product_detail.html', {'product': product})
+    if read_model.enabled():
+        product = read_model.current_snapshot().get(product_id)
+        if product is None:
+            raise Http404('No Product matches the given query.')
+        # Stock changes only reload the snapshot when a product goes in or out
+        # of stock, so show the live count (the quantity picker's maximum).
+        product = copy.copy(product)
+        product.stock = Product.objects.filter(id=product_id).values_list('stock', flat=True).first() or 0
+    else:
+        product = get_object_or_404(Product.objects.select_related('category'), id=product_id, is_active=True)
+    record_view(product.id)
+    return render(request, 'product_detail.html', product_detail_context(product))
+
+def _is_active_product(product_id):
+    # The id comes from the client; a buffered unknown id would fail the flush.
+    if read_model.enabled():
+        return read_model.current_snapshot().get(product_id) is not None
+    return Product.objects.filter(id=product_id, is_active=True).exists()
+
+@never_cache
+def session_fragment(request):
+    """Per-visitor navigation, messages and CSRF token for prerendered pages"""
+    product_id = request.GET.get('product', '')
+    if product_id.isdigit() and _is_active_product(int(product_id)):
+        record_view(int(product_id))
+
+    return JsonResponse({
+        'nav': render_to_string('fragments/session_nav.html', request=request),
+        'messages': render_to_string('fragments/messages.html', request=request),
+        'csrf_token': get_token(request),
+    })
 
 def add_to_cart(request, product_id):
     if request.method == 'POST':
@@ -186,6 +451,8 @@ def add_to_cart(request, product_id):
         if not created:
             cart_item.quantity += quantity
             cart_item.save()
+
+        record_cart_add(product.id, quantity)
         
         messages.success(request, f'{product.name} added to cart!')
         return redirect('product_detail', product_id=product_id)
@@ -213,4 +480,21 @@ def remove_from_cart(request, item_id):
 
 def user_logout(request):
     logout(request)
-    return redirect('login')
\ No newline at end of file
+    return redirect('login')
+
+def readiness(request):
+    cold = not warmup_state['warm']
+    try:
+        if cold:
+            warm_up()
+        else:
+            connection.ensure_connection()
+    except DatabaseError:
+        return JsonResponse({'ready': False}, status=503)
+
+    return JsonResponse({
+        'ready': True,
+        'cold_start': cold,
+        'boot_seconds': warmup_state['boot_seconds'],
+        'warmup_seconds': warmup_state['warmup_seconds'],
+    })
\ No newline at end of file
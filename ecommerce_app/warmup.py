@@ -0,0 +1,34 @@
+import time
+
+from django.db import connection
+from django.template.loader import get_template
+from django.urls import get_resolver, reverse
+
+WARM_TEMPLATES = ['base.html', 'home.html', 'products.html', 'product_detail.html', 'login.html', 'cart.html']
+WARM_URLS = ['home', 'products', 'login', 'view_cart']
+
+state = {
+    'boot_seconds': None,
+    'warm': False,
+    'warmup_seconds': None,
+}
+
+
+def record_boot(seconds):
+    state['boot_seconds'] = seconds
+
+
+def warm_up():
+    """Open the DB connection and fill the URL resolver and template loader caches"""
+    started = time.perf_counter()
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    get_resolver().url_patterns
+    for name in WARM_URLS:
+        reverse(name)
+    for name in WARM_TEMPLATES:
+        get_template(name)
+    state['warmup_seconds'] = time.perf_counter() - started
+    state['warm'] = True
+    return state['warmup_seconds']
@@ -8,6 +8,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clothing_ecommerce.settings')
 django.setup()
 
 from django.contrib.auth.models import User
+from ecommerce_app.inventory import record_initial_stock
 from ecommerce_app.models import Category, Product
 
 def setup_admin():
@@ -169,9 +170,12 @@ def setup_products():
         }
     ]
     
+    created = []
     for product_data in products_data:
         product = Product.objects.create(**product_data)
+        created.append(product)
         print(f'Created product: {product.name} - ${product.price}')
+    record_initial_stock(created)
 
 def main():
     print('Setting up RiseArc E-commerce Data...\n')
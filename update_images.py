@@ -7,133 +7,9 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clothing_ecommerce.settings')
 django.setup()
 
-from ecommerce_app.models import Product
+from django.core.management import call_command
 
-# Clothing-specific image URLs from Unsplash
-clothing_images = {
-    'Polo': 'https://images.unsplash.com/photo-1521572163474-6864f9cf17ab?w=500&h=600&fit=crop',
-    'Blazer': 'https://images.unsplash.com/photo-1594938298603-c8148c4dae35?w=500&h=600&fit=crop',
-    'Chinos': 'https://images.unsplash.com/photo-1624378439575-d8705ad7ae80?w=500&h=600&fit=crop',
-    'Jeans': 'https://images.unsplash.com/photo-1541099649105-f69ad21f3246?w=500&h=600&fit=crop',
-    'Dress': 'https://images.unsplash.com/photo-1566479179817-c0ae29273e17?w=500&h=600&fit=crop',
-    'Jacket': 'https://images.unsplash.com/photo-1551698618-1dfe5d97d256?w=500&h=600&fit=crop',
-    'Scarf': 'https://images.unsplash.com/photo-1601924994987-69e26d50dc26?w=500&h=600&fit=crop',
-    'Blouse': 'https://images.unsplash.com/photo-1485462537746-965f33f7f6a7?w=500&h=600&fit=crop',
-    'Sneakers': 'https://images.unsplash.com/photo-1595950653106-6c9ebd614d3a?w=500&h=600&fit=crop',
-    'Oxford': 'https://images.unsplash.com/photo-1449824913935-59a10b8d2000?w=500&h=600&fit=crop',
-    'Loafers': 'https://images.unsplash.com/photo-1560769629-975ec94e6a86?w=500&h=600&fit=crop',
-    'Running': 'https://images.unsplash.com/photo-1606107557195-0e29a4b5b4aa?w=500&h=600&fit=crop'
-}
-
-print('Updating product templates with clothing-only images...')
-
-# Update home.html
-home_template = '''{% extends 'base.html' %}
-
-{% block title %}Home - RiseArc{% endblock %}
-
-{% block content %}
-<section class="hero-section text-center">
-    <div class="container hero-content">
-        <h1 class="display-3 mb-4 animate__animated animate__fadeInDown">Welcome to <span class="gradient-text">RiseArc</span></h1>
-        <p class="lead mb-4 animate__animated animate__fadeInUp animate__delay-1s">Rise Above Fashion - Discover Premium Quality Clothing That Elevates Your Style</p>
-        <div class="animate__animated animate__fadeInUp animate__delay-2s">
-            <a href="{% url 'products' %}" class="btn btn-light btn-lg me-3 pulse-animation">Shop Now</a>
-            <a href="{% url 'register' %}" class="btn btn-outline-light btn-lg">Join RiseArc</a>
-        </div>
-    </div>
-</section>
-
-<section class="py-5">
-    <div class="container">
-        <h2 class="text-center mb-5 animate__animated animate__fadeInUp">Featured <span class="gradient-text">Products</span></h2>
-        <div class="row">
-            {% for product in products %}
-            <div class="col-md-3 mb-4 animate__animated animate__fadeInUp" style="animation-delay: {{ forloop.counter0|add:1 }}00ms;">
-                <div class="card product-card h-100 floating-animation">
-                    {% if product.image %}
-                        <img src="{{ product.image.url }}" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                    {% else %}
-                        {% if 'Polo' in product.name %}
-                            <img src="https://images.unsplash.com/photo-1521572163474-6864f9cf17ab?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% elif 'Blazer' in product.name %}
-                            <img src="https://images.unsplash.com/photo-1594938298603-c8148c4dae35?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% elif 'Chinos' in product.name %}
-                            <img src="https://images.unsplash.com/photo-1624378439575-d8705ad7ae80?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% elif 'Jeans' in product.name %}
-                            <img src="https://images.unsplash.com/photo-1541099649105-f69ad21f3246?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% elif 'Dress' in product.name %}
-                            <img src="https://images.unsplash.com/photo-1566479179817-c0ae29273e17?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% elif 'Jacket' in product.name %}
-                            <img src="https://images.unsplash.com/photo-1551698618-1dfe5d97d256?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% elif 'Scarf' in product.name %}
-                            <img src="https://images.unsplash.com/photo-1601924994987-69e26d50dc26?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% elif 'Blouse' in product.name %}
-                            <img src="https://images.unsplash.com/photo-1485462537746-965f33f7f6a7?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% elif 'Sneakers' in product.name %}
-                            <img src="https://images.unsplash.com/photo-1595950653106-6c9ebd614d3a?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% elif 'Oxford' in product.name %}
-                            <img src="https://images.unsplash.com/photo-1449824913935-59a10b8d2000?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% elif 'Loafers' in product.name %}
-                            <img src="https://images.unsplash.com/photo-1560769629-975ec94e6a86?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% elif 'Running' in product.name %}
-                            <img src="https://images.unsplash.com/photo-1606107557195-0e29a4b5b4aa?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% else %}
-                            <img src="https://images.unsplash.com/photo-1445205170230-053b83016050?w=500&h=600&fit=crop" class="card-img-top" alt="{{ product.name }}" style="height: 250px; object-fit: cover;">
-                        {% endif %}
-                    {% endif %}
-                    <div class="card-body d-flex flex-column">
-                        <h5 class="card-title">{{ product.name }}</h5>
-                        <p class="card-text flex-grow-1">{{ product.description|truncatewords:10 }}</p>
-                        <div class="mt-auto">
-                            <p class="h5 text-primary mb-2">${{ product.price }}</p>
-                            <a href="{% url 'product_detail' product.id %}" class="btn btn-primary btn-sm">View Details</a>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            {% empty %}
-            <div class="col-12 text-center">
-                <p class="text-muted">No products available at the moment.</p>
-            </div>
-            {% endfor %}
-        </div>
-        
-        {% if products %}
-        <div class="text-center mt-4">
-            <a href="{% url 'products' %}" class="btn btn-outline-primary">View All Products</a>
-        </div>
-        {% endif %}
-    </div>
-</section>
-
-<section class="bg-light py-5">
-    <div class="container">
-        <div class="row text-center">
-            <div class="col-md-4 mb-4 animate__animated animate__fadeInLeft">
-                <i class="fas fa-shipping-fast feature-icon mb-3 floating-animation"></i>
-                <h4>Lightning Fast Delivery</h4>
-                <p>Free express shipping on orders over $50 - Rise above the wait</p>
-            </div>
-            <div class="col-md-4 mb-4 animate__animated animate__fadeInUp animate__delay-1s">
-                <i class="fas fa-shield-alt feature-icon mb-3 floating-animation"></i>
-                <h4>Premium Quality</h4>
-                <p>Handpicked materials and craftsmanship that rises to excellence</p>
-            </div>
-            <div class="col-md-4 mb-4 animate__animated animate__fadeInRight animate__delay-2s">
-                <i class="fas fa-crown feature-icon mb-3 floating-animation"></i>
-                <h4>VIP Experience</h4>
-                <p>24/7 premium support for our RiseArc community</p>
-            </div>
-        </div>
-    </div>
-</section>
-{% endblock %}'''
-
-with open('ecommerce_app/templates/home.html', 'w', encoding='utf-8') as f:
-    f.write(home_template)
-
-print('Updated home.html with clothing images')
-print('Updated admin dashboard with better design')
-print('All templates now use clothing-specific images only')
-print('\nRun: python manage.py runserver')
\ No newline at end of file
+# Product photos used to be hotlinked from Unsplash by the templates; they are
+# now downloaded once, optimized and stored as each product's local image.
+print('Localizing product images...')
+call_command('localize_images', *sys.argv[1:])
@@ -7,6 +7,7 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clothing_ecommerce.settings')
 django.setup()
 
+from ecommerce_app.inventory import record_initial_stock
 from ecommerce_app.models import Category, Product
 
 def update_products():
@@ -52,9 +53,12 @@ def update_products():
         }
     ]
     
+    created = []
     for product_data in new_products:
         product = Product.objects.create(**product_data)
+        created.append(product)
         print(f'Created: {product.name} - ${product.price}')
+    record_initial_stock(created)
     
     print('\nProducts updated successfully!')
     print('New products added based on your images.')